@@ -0,0 +1,281 @@
+"""
+OpenAI Batch API 客户端
+用于非交互式的大批量参数调整（如夜间批量修改场景中所有烟雾特效），
+价格为实时接口的一半，并使用独立的速率限制额度
+轮询和下载结果都不阻塞编辑器：网络请求在后台线程执行，结果通过 Slate tick 回到游戏线程
+"""
+
+import unreal
+import json
+import time
+from ai.openai_client import _EXECUTOR
+
+
+def _call_later(delay, callback):
+    """在游戏线程中延迟 delay 秒后调用 callback()（基于 Slate tick 计时，不阻塞编辑器）"""
+    elapsed = [0.0]
+    handle = None
+
+    def _on_tick(delta_seconds):
+        elapsed[0] += delta_seconds
+        if elapsed[0] < delay:
+            return
+        unreal.unregister_slate_post_tick_callback(handle)
+        callback()
+
+    handle = unreal.register_slate_post_tick_callback(_on_tick)
+
+
+def _run_in_background(func, on_done, *args):
+    """在工作线程执行 func(*args)，完成后在游戏线程调用 on_done(result, error)"""
+    future = _EXECUTOR.submit(func, *args)
+    handle = None
+
+    def _on_tick(delta_seconds):
+        if not future.done():
+            return
+        unreal.unregister_slate_post_tick_callback(handle)
+        try:
+            result = future.result()
+        except Exception as e:
+            on_done(None, e)
+            return
+        on_done(result, None)
+
+    handle = unreal.register_slate_post_tick_callback(_on_tick)
+
+
+class NiagaraBatchClient:
+    """基于 OpenAI Batch API 的离线批量调整客户端"""
+
+    ENDPOINT = "/v1/chat/completions"
+    COMPLETION_WINDOW = "24h"
+    DEFAULT_POLL_INTERVAL = 30.0
+
+    # Batch 任务的终止状态
+    TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+    def __init__(self, ai_assistant):
+        """
+        初始化批量客户端
+        Args:
+            ai_assistant: NiagaraAIAssistant 实例（复用其 OpenAI 客户端、提示词和参数应用逻辑）
+        """
+        self.ai_assistant = ai_assistant
+        self._pending = {}  # batch_id -> [(component, user_input), ...]
+
+    def batch_adjust_offline(self, pairs, on_complete=None, poll_interval=DEFAULT_POLL_INTERVAL, timeout=None):
+        """
+        提交批量任务，在后台等待完成并应用所有结果（立即返回，不阻塞编辑器）
+        Args:
+            pairs: [(UNiagaraComponent, user_input), ...]
+            on_complete: 完成回调 on_complete({custom_id: 是否调整成功})，在游戏线程中调用
+            poll_interval: 轮询间隔（秒）
+            timeout: 最长等待时间（秒），None 表示一直等待
+        Returns:
+            str | None: Batch ID，提交失败返回 None
+        """
+        def _complete(results):
+            if on_complete is not None:
+                on_complete(results)
+
+        batch_id = self.submit(pairs)
+        if batch_id is None:
+            _complete({})
+            return None
+
+        def _on_batch(batch):
+            if batch is None:
+                _complete({})
+            else:
+                self.apply_results(batch, on_complete=_complete)
+
+        self.wait_for_batch(batch_id, on_complete=_on_batch, poll_interval=poll_interval, timeout=timeout)
+        return batch_id
+
+    def submit(self, pairs):
+        """
+        上传 JSONL 请求文件并创建 Batch 任务
+        Args:
+            pairs: [(UNiagaraComponent, user_input), ...]
+        Returns:
+            str | None: Batch ID，失败返回 None
+        """
+        if not self.ai_assistant.is_available():
+            unreal.log_error("❌ AI 服务不可用")
+            return None
+
+        if not pairs:
+            unreal.log_warning("⚠️ 没有需要提交的批量调整")
+            return None
+
+        try:
+            client = self.ai_assistant.client
+
+            lines = []
+            for i, (component, user_input) in enumerate(pairs):
+                param_types = self.ai_assistant._get_parameter_types(component)
+                lines.append(json.dumps({
+                    "custom_id": str(i),
+                    "method": "POST",
+                    "url": self.ENDPOINT,
+                    "body": self.ai_assistant._build_request(param_types, user_input)
+                }, ensure_ascii=False))
+
+            payload = ("\n".join(lines) + "\n").encode("utf-8")
+            input_file = client.files.create(
+                file=("niagara_batch.jsonl", payload),
+                purpose="batch"
+            )
+
+            batch = client.batches.create(
+                input_file_id=input_file.id,
+                endpoint=self.ENDPOINT,
+                completion_window=self.COMPLETION_WINDOW
+            )
+
+            self._pending[batch.id] = list(pairs)
+            unreal.log(f"📦 已提交批量任务 {batch.id}（{len(pairs)} 个请求）")
+            return batch.id
+
+        except Exception as e:
+            unreal.log_error(f"❌ 提交批量任务失败: {e}")
+            return None
+
+    def wait_for_batch(self, batch_id, on_complete=None, poll_interval=DEFAULT_POLL_INTERVAL, timeout=None):
+        """
+        在后台轮询 Batch 任务直到结束（立即返回，不阻塞编辑器）
+        Args:
+            batch_id: Batch ID
+            on_complete: 结束回调 on_complete(batch)，batch 为已完成的 Batch 对象，
+                         失败或超时为 None；在游戏线程中调用
+            poll_interval: 轮询间隔（秒）
+            timeout: 最长等待时间（秒），None 表示一直等待
+        """
+        client = self.ai_assistant.client
+        start = time.monotonic()
+
+        def _complete(batch):
+            if on_complete is not None:
+                on_complete(batch)
+
+        def _poll():
+            _run_in_background(client.batches.retrieve, _on_status, batch_id)
+
+        def _on_status(batch, error):
+            if error is not None:
+                unreal.log_error(f"❌ 查询批量任务失败: {error}")
+                _complete(None)
+                return
+
+            if batch.status in self.TERMINAL_STATUSES:
+                if batch.status != "completed":
+                    unreal.log_error(f"❌ 批量任务 {batch_id} 未完成（状态: {batch.status}）")
+                    _complete(None)
+                    return
+                unreal.log(f"✅ 批量任务 {batch_id} 已完成")
+                _complete(batch)
+                return
+
+            if timeout is not None and time.monotonic() - start > timeout:
+                unreal.log_warning(f"⚠️ 等待批量任务 {batch_id} 超时（状态: {batch.status}）")
+                _complete(None)
+                return
+
+            unreal.log(f"⏳ 批量任务 {batch_id} 状态: {batch.status}")
+            _call_later(poll_interval, _poll)
+
+        _poll()
+
+    def apply_results(self, batch, on_complete=None):
+        """
+        在后台下载 Batch 结果，再在游戏线程中按 custom_id 应用到对应组件
+        失败的请求只记录在 error_file_id 中；所有请求都失败时 output_file_id 为 None
+        Args:
+            batch: 已完成的 Batch 对象
+            on_complete: 完成回调 on_complete({custom_id: 是否调整成功})，在游戏线程中调用
+        """
+        def _complete(results):
+            if on_complete is not None:
+                on_complete(results)
+
+        pairs = self._pending.get(batch.id)
+        if pairs is None:
+            unreal.log_error(f"❌ 未找到批量任务 {batch.id} 的组件信息")
+            _complete({})
+            return
+
+        def _on_downloaded(contents, error):
+            if error is not None:
+                unreal.log_error(f"❌ 下载批量结果失败: {error}")
+                _complete({})
+                return
+            _complete(self._apply_records(batch.id, pairs, contents))
+
+        file_ids = [file_id for file_id in (batch.output_file_id, getattr(batch, "error_file_id", None)) if file_id]
+        _run_in_background(self._download_files, _on_downloaded, file_ids)
+
+    def _download_files(self, file_ids):
+        """下载结果文件内容（不访问 UE 对象，在工作线程中执行）"""
+        files = self.ai_assistant.client.files
+        return [files.content(file_id).text for file_id in file_ids]
+
+    def _apply_records(self, batch_id, pairs, contents):
+        """
+        解析结果文件并应用参数（必须在游戏线程调用）
+        Returns:
+            dict: {custom_id: 是否调整成功}，结果文件中缺失的请求记为失败
+        """
+        results = {}
+        try:
+            for content in contents:
+                for line in content.splitlines():
+                    self._apply_record(pairs, line, results)
+        except Exception as e:
+            unreal.log_error(f"❌ 处理批量任务 {batch_id} 的结果失败: {e}")
+
+        for i in range(len(pairs)):
+            results.setdefault(str(i), False)
+
+        self._pending.pop(batch_id, None)
+
+        success_count = sum(1 for ok in results.values() if ok)
+        unreal.log(f"📊 批量任务结果: {success_count}/{len(pairs)} 成功")
+        return results
+
+    def _apply_record(self, pairs, line, results):
+        """
+        解析并应用结果文件中的单行记录，失败时记录日志并跳过
+        Args:
+            pairs: 提交时的 (组件, 用户输入) 列表
+            line: 结果文件中的一行 JSON
+            results: 写入 {custom_id: 是否调整成功} 的结果字典
+        """
+        if not line.strip():
+            return
+
+        try:
+            record = json.loads(line)
+            custom_id = record.get("custom_id")
+        except (ValueError, AttributeError) as e:
+            unreal.log_warning(f"⚠️ 无法解析批量结果行: {line[:200]} ({e})")
+            return
+
+        try:
+            component, _ = pairs[int(custom_id)]
+        except (TypeError, ValueError, IndexError):
+            unreal.log_warning(f"⚠️ 未知的 custom_id: {custom_id}")
+            return
+
+        response = record.get("response") or {}
+        if record.get("error") or response.get("status_code") != 200:
+            unreal.log_error(f"❌ 请求 {custom_id} 失败: {record.get('error') or response.get('body')}")
+            results[custom_id] = False
+            return
+
+        try:
+            ai_response = response["body"]["choices"][0]["message"]["content"]
+            results[custom_id] = self.ai_assistant._handle_response(component, ai_response)
+        except Exception as e:
+            unreal.log_error(f"❌ 应用请求 {custom_id} 的结果失败: {e}")
+            results[custom_id] = False
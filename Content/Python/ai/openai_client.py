@@ -4,31 +4,365 @@ OpenAI AI 客户端
 """
 
 import unreal
-import json
-from utils.config import Config
+import asyncio
+import importlib.util
+import queue
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from utils.config import get_settings
+from utils.llm_cache import CacheStore, choose_ttl, make_cache_key
+from utils.semantic_cache import SemanticCache
+from utils.json_stream import ParametersStreamParser
 
 # 尝试导入 openai 库
 try:
     import openai
+    import httpx
     OPENAI_AVAILABLE = True
 except ImportError:
     OPENAI_AVAILABLE = False
     unreal.log_warning("⚠️ 未安装 openai 库，请在 UE Python 环境中运行: pip install openai")
 
+# 优先使用 orjson 解析响应（C 实现，比标准库 json 快数倍），未安装时回退到标准库
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
+
+
+# 进程内共享的 HTTP 连接池和 OpenAI 客户端（多次打开工具窗口时复用，避免重复握手和连接泄漏）
+_http_client = None
+_shared_client = None
+_shared_async_client = None
+_shared_async_http_client = None
+_shared_semantic_cache = None
+_shared_cache_store = None
+_client_lock = threading.Lock()
+# 异步请求使用的事件循环（跨调用复用，保证异步客户端的连接池一直有效）
+_event_loop = None
+
+def _get_http_client():
+    """获取（必要时创建）共享的 keep-alive HTTP 客户端"""
+    global _http_client
+    if _http_client is None:
+        # HTTP/2 需要额外安装 h2 库，未安装时退回 HTTP/1.1 keep-alive
+        http2 = importlib.util.find_spec("h2") is not None
+        _http_client = httpx.Client(
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64, keepalive_expiry=60.0),
+            http2=http2,
+            timeout=httpx.Timeout(60.0, connect=5.0)
+        )
+    return _http_client
+
+
+def _get_event_loop():
+    """获取（必要时创建）异步请求使用的事件循环（异步客户端的连接都绑定在这个循环上）"""
+    global _event_loop
+    if _event_loop is None or _event_loop.is_closed():
+        _event_loop = asyncio.new_event_loop()
+    return _event_loop
+
+
+def _close_async_http_client(client):
+    """在异步请求使用的事件循环中关闭异步 HTTP 客户端（失败时只记录日志）"""
+    try:
+        loop = _get_event_loop()
+        if loop.is_running():
+            loop.create_task(client.aclose())
+        else:
+            loop.run_until_complete(client.aclose())
+    except Exception as e:
+        unreal.log_warning(f"⚠️ 关闭异步 HTTP 客户端失败: {e}")
+
+
+def _get_shared_clients(api_key, async_max_keepalive_connections):
+    """
+    获取（必要时创建）共享的同步 / 异步 OpenAI 客户端
+    Args:
+        api_key: OpenAI API Key（与已创建客户端不一致时重新创建）
+        async_max_keepalive_connections: 异步客户端的最大保活连接数
+    Returns:
+        tuple: (openai.OpenAI, openai.AsyncOpenAI)
+    """
+    global _shared_client, _shared_async_client, _shared_async_http_client
+    with _client_lock:
+        if _shared_client is None or _shared_client.api_key != api_key:
+            # API Key 变化时先关闭旧的异步连接池，避免泄漏
+            if _shared_async_http_client is not None:
+                _close_async_http_client(_shared_async_http_client)
+            _shared_client = openai.OpenAI(api_key=api_key, http_client=_get_http_client())
+            _shared_async_http_client = httpx.AsyncClient(
+                limits=httpx.Limits(max_keepalive_connections=async_max_keepalive_connections)
+            )
+            _shared_async_client = openai.AsyncOpenAI(api_key=api_key, http_client=_shared_async_http_client)
+        return _shared_client, _shared_async_client
+
+
+def _get_shared_semantic_cache(threshold, max_entries, model_name):
+    """获取（必要时创建）共享的语义缓存（多次打开工具窗口时保留向量索引和已加载的模型）"""
+    global _shared_semantic_cache
+    with _client_lock:
+        if _shared_semantic_cache is None or _shared_semantic_cache.model_name != model_name:
+            _shared_semantic_cache = SemanticCache(
+                threshold=threshold, max_entries=max_entries, model_name=model_name
+            )
+        return _shared_semantic_cache
+
+
+def _get_shared_cache_store(sqlite_path, max_entries, default_ttl):
+    """获取（必要时创建）共享的 LLM 响应缓存（所有助手实例共用一个 SQLite 连接）"""
+    global _shared_cache_store
+    with _client_lock:
+        if _shared_cache_store is None or _shared_cache_store.sqlite_path != sqlite_path:
+            if _shared_cache_store is not None:
+                _shared_cache_store.close()
+            _shared_cache_store = CacheStore(sqlite_path, max_entries, default_ttl)
+        else:
+            _shared_cache_store.max_entries = max_entries
+            _shared_cache_store.default_ttl = default_ttl
+        return _shared_cache_store
+
+
+def close_http_client():
+    """关闭共享的 HTTP 客户端、OpenAI 客户端和 LLM 缓存连接（插件卸载时调用）"""
+    global _http_client, _shared_client, _shared_async_client, _shared_async_http_client, _shared_cache_store
+    with _client_lock:
+        _shared_client = None
+        _shared_async_client = None
+        if _shared_async_http_client is not None:
+            _close_async_http_client(_shared_async_http_client)
+            _shared_async_http_client = None
+        if _event_loop is not None and not _event_loop.is_running():
+            _event_loop.close()
+        if _shared_cache_store is not None:
+            _shared_cache_store.close()
+            _shared_cache_store = None
+        if _http_client is not None:
+            _http_client.close()
+            _http_client = None
+
+
+# 后台执行 OpenAI 请求的线程池（网络等待不阻塞编辑器游戏线程）
+_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="AINiagaraFX")
+
+def shutdown_executor():
+    """关闭后台线程池（插件卸载时调用）"""
+    _EXECUTOR.shutdown(wait=False)
+
+
+# 系统提示词（保持为固定不变的常量，不插入任何动态内容）
+# 每次请求的消息都以它开头，前缀完全一致；当前组件的参数列表只放在用户消息中
+_PROMPT_BASE = """你是 Unreal Engine Niagara 粒子系统专家。
+你的任务是将用户的自然语言描述转换为 Niagara 参数调整指令。
+
+常见参数说明：
+- SpawnRate (Float): 粒子生成速率，值越大粒子越多
+- Color (LinearColor): 粒子颜色，RGBA 格式 (0-1)
+- Size (Vector): 粒子大小，XYZ 三个方向的缩放
+- Velocity (Vector): 粒子速度
+- Lifetime (Float): 粒子生命周期（秒）
+
+**输出格式要求（必须是有效的 JSON）**:
+{
+  "parameters": {
+    "参数名1": 数值或对象,
+    "参数名2": 数值或对象
+  },
+  "explanation": "调整说明"
+}
+
+**示例**（参数名仅为示意，实际只能使用用户消息中列出的可用参数）:
+用户输入: "让火焰更大更红"
+输出:
+{
+  "parameters": {
+    "Color": {"r": 1.0, "g": 0.2, "b": 0.1, "a": 1.0},
+    "Size": {"x": 2.0, "y": 2.0, "z": 2.0}
+  },
+  "explanation": "增加了红色分量，并将粒子大小扩大2倍"
+}
+
+"""
+
+# 额外的固定示例：只在支持自动提示词缓存的模型上追加，使前缀超过 1024 token 以命中 OpenAI 服务端缓存；
+# 其他模型（如 gpt-4）没有缓存收益，追加只会增加每次请求的预填充开销
+# 实测（tiktoken o200k_base，上述模型均使用该编码）：_SYSTEM_PROMPT 444 token，_SYSTEM_PROMPT_CACHEABLE 1199 token；
+# 修改提示词后需重新测量，保证不低于 1024
+_PROMPT_EXTRA_EXAMPLES = """用户输入: "粒子更密集一些"
+输出:
+{
+  "parameters": {
+    "SpawnRate": 500.0
+  },
+  "explanation": "提高粒子生成速率，让效果更密集"
+}
+
+用户输入: "改成蓝色的魔法效果"
+输出:
+{
+  "parameters": {
+    "Color": {"r": 0.1, "g": 0.3, "b": 1.0, "a": 1.0}
+  },
+  "explanation": "将粒子颜色调整为偏亮的蓝色"
+}
+
+用户输入: "减慢粒子速度，让烟雾飘得更久"
+输出:
+{
+  "parameters": {
+    "Velocity": {"x": 0.0, "y": 0.0, "z": 50.0},
+    "Lifetime": 5.0
+  },
+  "explanation": "降低上升速度，并延长粒子生命周期到 5 秒"
+}
+
+用户输入: "让火花小一点、稀疏一点"
+输出:
+{
+  "parameters": {
+    "SpawnRate": 50.0,
+    "Size": {"x": 0.5, "y": 0.5, "z": 0.5}
+  },
+  "explanation": "降低生成速率，并将粒子缩小为原来的一半"
+}
+
+用户输入: "半透明的绿色毒雾"
+输出:
+{
+  "parameters": {
+    "Color": {"r": 0.2, "g": 0.9, "b": 0.2, "a": 0.5}
+  },
+  "explanation": "使用绿色并将透明度降低到 0.5"
+}
+
+用户输入: "爆炸更猛烈"
+输出:
+{
+  "parameters": {
+    "SpawnRate": 2000.0,
+    "Velocity": {"x": 0.0, "y": 0.0, "z": 800.0},
+    "Size": {"x": 1.5, "y": 1.5, "z": 1.5}
+  },
+  "explanation": "大幅提高生成速率和初速度，并适当放大粒子"
+}
+
+用户输入: "火焰持续时间短一点，颜色偏橙"
+输出:
+{
+  "parameters": {
+    "Lifetime": 0.8,
+    "Color": {"r": 1.0, "g": 0.5, "b": 0.1, "a": 1.0}
+  },
+  "explanation": "缩短粒子生命周期，并将颜色调整为橙色"
+}
+
+用户输入: "雪花缓慢飘落"
+输出:
+{
+  "parameters": {
+    "Velocity": {"x": 0.0, "y": 0.0, "z": -30.0},
+    "Color": {"r": 1.0, "g": 1.0, "b": 1.0, "a": 0.9},
+    "Lifetime": 8.0
+  },
+  "explanation": "设置为缓慢向下的速度，白色略透明，并延长生命周期"
+}
+
+用户输入: "关闭粒子效果"
+输出:
+{
+  "parameters": {
+    "SpawnRate": 0.0
+  },
+  "explanation": "将生成速率设为 0，停止产生新粒子"
+}
+
+"""
+
+_PROMPT_RULES = """**重要规则**:
+1. 只输出 JSON，不要额外的文字
+2. 参数名称必须存在于当前系统中
+3. 数值必须合理（避免极端值）
+4. Color 格式为 {"r": 0-1, "g": 0-1, "b": 0-1, "a": 0-1}
+5. Vector 格式为 {"x": 数值, "y": 数值, "z": 数值}
+6. 用户没有提到的参数不要修改
+7. 无法理解需求或没有可用参数时，返回空的 "parameters" 并在 "explanation" 中说明原因
+"""
+
+_SYSTEM_PROMPT = _PROMPT_BASE + _PROMPT_RULES
+_SYSTEM_PROMPT_CACHEABLE = _PROMPT_BASE + _PROMPT_EXTRA_EXAMPLES + _PROMPT_RULES
+
+# 支持自动提示词缓存的模型前缀（gpt-4o 及更新的模型）
+_PROMPT_CACHING_MODEL_PREFIXES = ("gpt-4o", "gpt-4.1", "gpt-4.5", "gpt-5", "o1", "o3", "o4")
+
+
+def _supports_prompt_caching(model):
+    """检查模型是否支持 OpenAI 自动提示词缓存"""
+    return model.startswith(_PROMPT_CACHING_MODEL_PREFIXES)
+
+
+# 参数表裁剪用的关键词提示：用户输入中出现左侧词语时，名称中含右侧词元的参数视为相关
+# 用户输入多为中文，而参数名是英文，只靠字符相似度无法排序
+_KEYWORD_HINTS = {
+    "颜色": ("color", "tint"), "色": ("color", "tint"), "红": ("color",), "蓝": ("color",),
+    "绿": ("color",), "黄": ("color",), "紫": ("color",), "白": ("color",), "黑": ("color",),
+    "red": ("color",), "blue": ("color",), "green": ("color",), "colou": ("color", "tint"),
+    "大": ("size", "scale", "radius"), "小": ("size", "scale", "radius"), "尺寸": ("size", "scale"),
+    "速度": ("velocity", "speed"), "快": ("velocity", "speed"), "慢": ("velocity", "speed"),
+    "数量": ("spawn", "rate", "count"), "密": ("spawn", "rate", "count"), "多": ("spawn", "rate", "count"),
+    "少": ("spawn", "rate", "count"), "生命": ("lifetime", "life"), "持续": ("lifetime", "duration"),
+    "亮": ("intensity", "brightness", "emissive"), "暗": ("intensity", "brightness", "emissive"),
+    "透明": ("alpha", "opacity"), "重力": ("gravity",), "旋转": ("rotation", "spin"),
+}
+
+_NAME_TOKEN_PATTERN = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+")
+
+
+def _relevance_score(name, query, hint_tokens):
+    """参数名与用户输入的相关度：名称词元命中提示词元或直接出现在输入中的个数"""
+    tokens = [token.lower() for token in _NAME_TOKEN_PATTERN.findall(name)]
+    return sum(1 for token in tokens if token in hint_tokens or (len(token) >= 3 and token in query))
+
+
+class _AdjustmentState:
+    """单次参数调整的中间状态（流式响应时记录已经增量应用的参数）"""
+    
+    def __init__(self):
+        self.seen = set()
+        self.applied = []
+        self.failed = []
+
 
 class NiagaraAIAssistant:
     """AI 驱动的 Niagara 参数调整助手"""
     
+    # 异步客户端的最大保活连接数（兼顾 OpenAI 速率限制）
+    ASYNC_MAX_KEEPALIVE_CONNECTIONS = 20
+    
+    # 参数超过该数量时，只把与用户输入最相关的 SCHEMA_TOP_K 个写入提示词
+    SCHEMA_MAX_PARAMETERS = 50
+    SCHEMA_TOP_K = 30
+    
+    # 流式请求的额外参数（最后一个响应块附带 token 用量，用于写入缓存）
+    STREAM_OPTIONS = {"stream": True, "stream_options": {"include_usage": True}}
+    
     def __init__(self, parameter_manager):
         """
         初始化 AI 助手
         Args:
             parameter_manager: ParameterManager 实例
         """
+        settings = get_settings()
         self.param_manager = parameter_manager
-        self.api_key = Config.get_api_key()
-        self.model = Config.get_model_name()
-        self.temperature = Config.get_temperature()
+        self.api_key = settings.api_key
+        self.model = settings.model
+        self.temperature = settings.temperature
+        self.stream = settings.stream
+        self.verbose = settings.verbose
+        self.cache_ttl = settings.cache_ttl
+        self.cache_dynamic_ttl = settings.cache_dynamic_ttl
+        self.cache = self._open_cache(settings)
+        self.semantic_cache = self._open_semantic_cache(settings)
         
         if not OPENAI_AVAILABLE:
             unreal.log_error("❌ OpenAI 库不可用")
@@ -38,20 +372,40 @@ class NiagaraAIAssistant:
             unreal.log_error("❌ 未配置 OpenAI API Key")
             return
         
-        # 初始化 OpenAI 客户端
-        self.client = openai.OpenAI(api_key=self.api_key)
+        # 引用进程内共享的 OpenAI 客户端（同步客户端保持向后兼容，异步客户端用于批量并发请求）
+        self.client, self.aclient = _get_shared_clients(
+            self.api_key, self.ASYNC_MAX_KEEPALIVE_CONNECTIONS
+        )
         unreal.log(f"✅ OpenAI 客户端初始化成功（模型: {self.model}）")
     
+    @staticmethod
+    def _open_cache(settings):
+        """获取共享的 LLM 响应缓存（失败时不使用缓存）"""
+        try:
+            return _get_shared_cache_store(settings.cache_path, settings.cache_max_entries, settings.cache_ttl)
+        except Exception as e:
+            unreal.log_warning(f"⚠️ LLM 缓存不可用，将直接调用 API: {e}")
+            return None
+    
+    def _open_semantic_cache(self, settings):
+        """获取共享的语义缓存（依赖精确缓存存放响应内容）"""
+        if self.cache is None or not settings.semantic_cache_enabled or not SemanticCache.is_available():
+            return None
+        return _get_shared_semantic_cache(
+            settings.semantic_cache_threshold, settings.cache_max_entries, settings.semantic_cache_model
+        )
+    
     def is_available(self):
         """检查 AI 服务是否可用"""
         return OPENAI_AVAILABLE and self.api_key is not None
     
-    def adjust_parameters(self, niagara_component, user_input):
+    def adjust_parameters(self, niagara_component, user_input, use_cache=True):
         """
-        根据用户自然语言输入调整 Niagara 参数
+        根据用户自然语言输入调整 Niagara 参数（阻塞直到完成）
         Args:
             niagara_component: UNiagaraComponent
             user_input: 用户输入的自然语言（如 "让火焰更大更红"）
+            use_cache: 是否查询缓存；False 时强制请求新的回答（成功后仍会更新缓存）
         Returns:
             bool: 是否调整成功
         """
@@ -62,34 +416,134 @@ class NiagaraAIAssistant:
         try:
             unreal.log(f"🤖 AI 处理中: {user_input}")
             
-            # 1. 构建提示词
-            prompt = self._build_prompt(niagara_component, user_input)
+            # 1. 构建请求并查询缓存
+            request, cache_key, param_names, cached = self._prepare_request(niagara_component, user_input, use_cache)
+            if cached is not None:
+                return self._handle_response(niagara_component, cached)
             
-            # 2. 调用 OpenAI API
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": self._get_system_prompt()},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=self.temperature,
-                response_format={"type": "json_object"}  # 强制 JSON 输出
+            # 2. 调用 OpenAI API（流式模式下每个参数条目一闭合就立即写入）
+            state = _AdjustmentState()
+            ai_response, usage = self._fetch_response(
+                request,
+                on_entries=lambda entries: self._apply_entries(niagara_component, state, entries)
             )
             
-            # 3. 解析响应
-            ai_response = response.choices[0].message.content
-            unreal.log(f"📡 AI 响应: {ai_response}")
+            # 3. 应用剩余参数并写入缓存
+            success = self._handle_response(niagara_component, ai_response, state)
+            if success:
+                self._store_cache(cache_key, ai_response, usage, user_input, param_names)
+            return success
             
-            adjustments = json.loads(ai_response)
+        except Exception as e:
+            unreal.log_error(f"❌ AI 调整失败: {e}")
+            import traceback
+            unreal.log_error(traceback.format_exc())
+            return False
+    
+    def adjust_parameters_in_background(self, niagara_component, user_input, on_complete=None, use_cache=True):
+        """
+        在后台线程请求 AI，参数写入仍在游戏线程中完成（编辑器在等待期间保持响应）
+        Args:
+            niagara_component: UNiagaraComponent
+            user_input: 用户输入的自然语言
+            on_complete: 完成回调 on_complete(success)，在游戏线程中调用
+            use_cache: 是否查询缓存；False 时强制请求新的回答
+        Returns:
+            bool: 是否成功发起（命中缓存时直接同步完成）
+        """
+        def _complete(success):
+            if on_complete is not None:
+                on_complete(success)
+        
+        if not self.is_available():
+            unreal.log_error("❌ AI 服务不可用")
+            return False
+        
+        try:
+            unreal.log(f"🤖 AI 处理中（后台）: {user_input}")
+            
+            # UE 反射查询和缓存查询都在游戏线程完成
+            request, cache_key, param_names, cached = self._prepare_request(niagara_component, user_input, use_cache)
+            if cached is not None:
+                _complete(self._handle_response(niagara_component, cached))
+                return True
+        except Exception as e:
+            unreal.log_error(f"❌ AI 调整失败: {e}")
+            return False
+        
+        # 工作线程只负责网络请求，增量解析出的参数条目通过队列交给游戏线程
+        state = _AdjustmentState()
+        entries = queue.Queue()
+        future = _EXECUTOR.submit(self._fetch_response, request, entries.put)
+        handle = None
+        
+        def _drain_entries():
+            # 把本帧到达的所有条目合并为一次 set_batch 调用
+            pending = {}
+            while True:
+                try:
+                    pending.update(entries.get_nowait())
+                except queue.Empty:
+                    break
+            if pending:
+                self._apply_entries(niagara_component, state, pending)
+        
+        def _on_tick(delta_seconds):
+            try:
+                _drain_entries()
+            except Exception as e:
+                # 未应用的条目会在响应完成后由 _handle_response 补上
+                unreal.log_error(f"❌ 应用流式参数失败: {e}")
+            if not future.done():
+                return
             
-            # 4. 应用参数调整
-            success = self._apply_adjustments(niagara_component, adjustments)
+            unreal.unregister_slate_post_tick_callback(handle)
+            try:
+                ai_response, usage = future.result()
+                _drain_entries()
+                success = self._handle_response(niagara_component, ai_response, state)
+                if success:
+                    self._store_cache(cache_key, ai_response, usage, user_input, param_names)
+            except Exception as e:
+                unreal.log_error(f"❌ AI 调整失败: {e}")
+                import traceback
+                unreal.log_error(traceback.format_exc())
+                success = False
+            _complete(success)
+        
+        handle = unreal.register_slate_post_tick_callback(_on_tick)
+        return True
+    
+    async def adjust_parameters_async(self, niagara_component, user_input, use_cache=True):
+        """
+        adjust_parameters 的异步版本，可配合 asyncio.gather 并发调整多个组件
+        Args:
+            niagara_component: UNiagaraComponent
+            user_input: 用户输入的自然语言
+            use_cache: 是否查询缓存；False 时强制请求新的回答
+        Returns:
+            bool: 是否调整成功
+        """
+        if not self.is_available():
+            unreal.log_error("❌ AI 服务不可用")
+            return False
+        
+        try:
+            unreal.log(f"🤖 AI 处理中（异步）: {user_input}")
             
-            if success:
-                unreal.log("✅ AI 参数调整完成!")
-                explanation = adjustments.get("explanation", "无说明")
-                unreal.log(f"💡 调整说明: {explanation}")
+            request, cache_key, param_names, cached = self._prepare_request(niagara_component, user_input, use_cache)
+            if cached is not None:
+                return self._handle_response(niagara_component, cached)
             
+            state = _AdjustmentState()
+            ai_response, usage = await self._fetch_response_async(
+                request,
+                on_entries=lambda entries: self._apply_entries(niagara_component, state, entries)
+            )
+            
+            success = self._handle_response(niagara_component, ai_response, state)
+            if success:
+                self._store_cache(cache_key, ai_response, usage, user_input, param_names)
             return success
             
         except Exception as e:
@@ -98,53 +552,206 @@ class NiagaraAIAssistant:
             unreal.log_error(traceback.format_exc())
             return False
     
+    def _prepare_request(self, component, user_input, use_cache=True):
+        """
+        构建请求并查询缓存（三种调用方式共用，必须在游戏线程调用）
+        Args:
+            component: UNiagaraComponent
+            user_input: 用户输入的自然语言
+            use_cache: 为 False 时跳过缓存查询
+        Returns:
+            tuple: (请求参数, 缓存 Key, 参数名称列表, 缓存的响应文本或 None)
+        """
+        param_types = self._get_parameter_types(component)
+        param_names = list(param_types)
+        request = self._build_request(param_types, user_input)
+        cache_key = self._get_cache_key(request, param_names)
+        cached = self._lookup_cache(cache_key, user_input, param_names) if use_cache else None
+        return request, cache_key, param_names, cached
+    
+    def _fetch_response(self, request, on_entries=None):
+        """
+        发送请求并返回完整响应文本（不访问 UE 对象，可在工作线程中执行）
+        Args:
+            request: chat.completions.create 的请求参数
+            on_entries: 流式模式下每个响应块解析出完整参数条目时调用 on_entries({name: value})
+        Returns:
+            tuple[str, object]: (响应文本, token 用量)
+        """
+        if not self.stream:
+            response = self.client.chat.completions.create(**request)
+            return response.choices[0].message.content, response.usage
+        
+        parser = ParametersStreamParser()
+        usage = None
+        for chunk in self.client.chat.completions.create(**request, **self.STREAM_OPTIONS):
+            usage = self._feed_stream_chunk(parser, chunk, on_entries) or usage
+        return parser.get_text(), usage
+    
+    async def _fetch_response_async(self, request, on_entries=None):
+        """_fetch_response 的异步版本"""
+        if not self.stream:
+            response = await self.aclient.chat.completions.create(**request)
+            return response.choices[0].message.content, response.usage
+        
+        parser = ParametersStreamParser()
+        usage = None
+        stream = await self.aclient.chat.completions.create(**request, **self.STREAM_OPTIONS)
+        async for chunk in stream:
+            usage = self._feed_stream_chunk(parser, chunk, on_entries) or usage
+        return parser.get_text(), usage
+    
+    @staticmethod
+    def _feed_stream_chunk(parser, chunk, on_entries):
+        """
+        处理一个流式响应块
+        Returns:
+            最后一个响应块附带的 token 用量（其余块返回 None）
+        """
+        if chunk.choices:
+            delta = chunk.choices[0].delta.content
+            if delta:
+                entries = parser.feed(delta)
+                if entries and on_entries is not None:
+                    on_entries(dict(entries))
+        return getattr(chunk, "usage", None)
+    
+    def _get_parameter_types(self, component):
+        """
+        获取组件参数的类型表（去掉命名空间前缀）
+        类型表不可用时退回参数名称列表，类型记为 "unknown"
+        Returns:
+            dict[str, str]: {参数名: 类型名}
+        """
+        param_types = self.param_manager.get_parameter_types(component)
+        if not param_types:
+            param_types = {name: "unknown" for name in self.param_manager.get_parameter_names(component)}
+        
+        # C++ 写入时会自动补上命名空间，提示词里只保留短名称
+        return {name.rsplit(".", 1)[-1]: type_name for name, type_name in param_types.items()}
+    
+    def _build_request(self, param_types, user_input):
+        """构建 chat.completions.create 的请求参数"""
+        prompt = self._build_prompt(param_types, user_input)
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": self._get_system_prompt()},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": self.temperature,
+            "response_format": {"type": "json_object"}  # 强制 JSON 输出
+        }
+    
+    def _get_cache_key(self, request, param_names):
+        """根据请求内容和组件的参数结构计算缓存 Key"""
+        messages = request["messages"]
+        return make_cache_key(
+            request["model"],
+            request["temperature"],
+            messages[0]["content"],
+            messages[1]["content"],
+            param_names
+        )
+    
+    def _cache_get(self, cache_key):
+        """查询缓存，未命中或缓存不可用时返回 None"""
+        if self.cache is None:
+            return None
+        try:
+            cached = self.cache.get(cache_key)
+        except Exception as e:
+            unreal.log_warning(f"⚠️ 读取 LLM 缓存失败: {e}")
+            return None
+        if cached is not None:
+            unreal.log("⚡ 命中 LLM 缓存，跳过 API 调用")
+        return cached
+    
+    def _cache_put(self, cache_key, ai_response, usage=None, ttl=None):
+        """将 API 响应写入缓存"""
+        if self.cache is None:
+            return
+        try:
+            self.cache.put(
+                cache_key,
+                ai_response,
+                tokens_in=getattr(usage, "prompt_tokens", 0) or 0,
+                tokens_out=getattr(usage, "completion_tokens", 0) or 0,
+                ttl=ttl
+            )
+        except Exception as e:
+            unreal.log_warning(f"⚠️ 写入 LLM 缓存失败: {e}")
+    
+    def _lookup_cache(self, cache_key, user_input, param_names):
+        """先查精确缓存，未命中再查语义缓存"""
+        cached = self._cache_get(cache_key)
+        if cached is not None or self.semantic_cache is None:
+            return cached
+        
+        try:
+            similar_key = self.semantic_cache.lookup(user_input, param_names)
+        except Exception as e:
+            unreal.log_warning(f"⚠️ 查询语义缓存失败: {e}")
+            return None
+        if similar_key is None:
+            return None
+        return self._cache_get(similar_key)
+    
+    def _store_cache(self, cache_key, ai_response, usage, user_input, param_names):
+        """
+        将 API 响应写入精确缓存（按用户输入选择有效期），并登记到语义缓存
+        只应对成功应用了参数的响应调用，避免重试同一需求时重放失败的回答
+        """
+        ttl = choose_ttl(user_input, self.cache_ttl, self.cache_dynamic_ttl)
+        self._cache_put(cache_key, ai_response, usage, ttl)
+        if self.semantic_cache is None:
+            return
+        try:
+            self.semantic_cache.add(user_input, param_names, cache_key)
+        except Exception as e:
+            unreal.log_warning(f"⚠️ 写入语义缓存失败: {e}")
+    
+    def _handle_response(self, component, ai_response, state=None):
+        """
+        解析 AI 响应文本并应用参数调整
+        Args:
+            component: UNiagaraComponent
+            ai_response: 完整的响应文本
+            state: 流式响应时已增量应用的参数记录
+        """
+        if self.verbose:
+            unreal.log(f"📡 AI 响应: {ai_response}")
+        
+        adjustments = _json.loads(ai_response)
+        
+        success = self._apply_adjustments(component, adjustments, state)
+        self._report_completion(adjustments, success)
+        return success
+    
+    def _apply_entries(self, component, state, entries):
+        """立即应用流式响应中已完成的参数条目（单次 set_batch 调用，必须在游戏线程调用）"""
+        state.seen.update(entries)
+        applied, failed = self.param_manager.set_batch(component, entries)
+        state.applied.extend(applied)
+        state.failed.extend(failed)
+    
+    @staticmethod
+    def _report_completion(adjustments, success):
+        """输出调整完成信息和 AI 的调整说明"""
+        if success:
+            explanation = adjustments.get("explanation", "无说明")
+            unreal.log(f"💡 AI 参数调整完成: {explanation}")
+    
     def _get_system_prompt(self):
-        """获取系统提示词"""
-        return """你是 Unreal Engine Niagara 粒子系统专家。
-你的任务是将用户的自然语言描述转换为 Niagara 参数调整指令。
-
-常见参数说明：
-- SpawnRate (Float): 粒子生成速率，值越大粒子越多
-- Color (LinearColor): 粒子颜色，RGBA 格式 (0-1)
-- Size (Vector): 粒子大小，XYZ 三个方向的缩放
-- Velocity (Vector): 粒子速度
-- Lifetime (Float): 粒子生命周期（秒）
-
-**输出格式要求（必须是有效的 JSON）**:
-{
-  "parameters": {
-    "参数名1": 数值或对象,
-    "参数名2": 数值或对象
-  },
-  "explanation": "调整说明"
-}
-
-**示例**:
-用户输入: "让火焰更大更红"
-输出:
-{
-  "parameters": {
-    "Color": {"r": 1.0, "g": 0.2, "b": 0.1, "a": 1.0},
-    "Size": {"x": 2.0, "y": 2.0, "z": 2.0}
-  },
-  "explanation": "增加了红色分量，并将粒子大小扩大2倍"
-}
-
-**重要规则**:
-1. 只输出 JSON，不要额外的文字
-2. 参数名称必须存在于当前系统中
-3. 数值必须合理（避免极端值）
-4. Color 格式为 {"r": 0-1, "g": 0-1, "b": 0-1, "a": 0-1}
-5. Vector 格式为 {"x": 数值, "y": 数值, "z": 数值}
-"""
+        """获取系统提示词（模型支持提示词缓存时使用带额外示例的版本）"""
+        if _supports_prompt_caching(self.model):
+            return _SYSTEM_PROMPT_CACHEABLE
+        return _SYSTEM_PROMPT
     
-    def _build_prompt(self, component, user_input):
+    def _build_prompt(self, param_types, user_input):
         """构建完整提示词（包含当前参数上下文）"""
-        # 获取当前参数列表
-        param_names = self.param_manager.get_parameter_names(component)
-        
-        prompt = f"""当前 Niagara 系统可用参数：
-{', '.join(param_names)}
+        prompt = f"""当前 Niagara 系统可用参数（按类型分组）：
+{self._build_parameter_schema(param_types, user_input)}
 
 用户需求：{user_input}
 
@@ -152,12 +759,34 @@ class NiagaraAIAssistant:
 """
         return prompt
     
-    def _apply_adjustments(self, component, adjustments):
+    def _build_parameter_schema(self, param_types, user_input):
+        """
+        构建紧凑的参数表，如 "float:[SpawnRate,Lifetime]"，每种类型一行
+        参数过多时只保留与用户输入最相关的一部分，减少提示词 token；
+        没有任何参数与输入相关时保留全部参数，避免误删模型需要的参数
+        """
+        names = sorted(param_types)
+        if len(names) > self.SCHEMA_MAX_PARAMETERS:
+            query = user_input.lower()
+            hint_tokens = {token for keyword, tokens in _KEYWORD_HINTS.items() if keyword in query for token in tokens}
+            scores = {name: _relevance_score(name, query, hint_tokens) for name in names}
+            if any(scores.values()):
+                names.sort(key=lambda name: scores[name], reverse=True)
+                names = sorted(names[:self.SCHEMA_TOP_K])
+        
+        groups = {}
+        for name in names:
+            groups.setdefault(param_types[name], []).append(name)
+        
+        return "\n".join(f"{type_name}:[{','.join(group)}]" for type_name, group in groups.items())
+    
+    def _apply_adjustments(self, component, adjustments, state=None):
         """
         应用 AI 生成的参数调整
         Args:
             component: UNiagaraComponent
             adjustments: AI 返回的 JSON 对象
+            state: 流式响应时已增量应用的参数记录（这些参数不会重复写入）
         Returns:
             bool: 是否全部成功
         """
@@ -166,42 +795,30 @@ class NiagaraAIAssistant:
             unreal.log_warning("⚠️ AI 未返回任何参数调整")
             return False
         
-        success_count = 0
-        total_count = len(parameters)
-        
-        for param_name, value in parameters.items():
-            # 根据值的类型判断参数类型
-            if isinstance(value, dict):
-                # 可能是 Color 或 Vector
-                if "r" in value and "g" in value and "b" in value:
-                    # Color
-                    r = value.get("r", 1.0)
-                    g = value.get("g", 1.0)
-                    b = value.get("b", 1.0)
-                    a = value.get("a", 1.0)
-                    if self.param_manager.set_color(component, param_name, r, g, b, a):
-                        success_count += 1
-                
-                elif "x" in value and "y" in value and "z" in value:
-                    # Vector
-                    x = value.get("x", 0.0)
-                    y = value.get("y", 0.0)
-                    z = value.get("z", 0.0)
-                    if self.param_manager.set_vector(component, param_name, x, y, z):
-                        success_count += 1
-            
-            elif isinstance(value, (int, float)):
-                # Float
-                if self.param_manager.set_float(component, param_name, value):
-                    success_count += 1
-            
-            elif isinstance(value, bool):
-                # Bool
-                if self.param_manager.set_bool(component, param_name, value):
-                    success_count += 1
-            
-            else:
-                unreal.log_warning(f"⚠️ 未知参数类型: {param_name} = {value}")
+        state = state or _AdjustmentState()
+        
+        # 单次批量调用写入剩余的全部参数
+        remaining = {name: value for name, value in parameters.items() if name not in state.seen}
+        if remaining:
+            applied, failed = self.param_manager.set_batch(component, remaining)
+            state.applied.extend(applied)
+            state.failed.extend(failed)
+        
+        return self._log_adjustment_result(state.applied, state.failed, len(parameters))
+    
+    @staticmethod
+    def _log_adjustment_result(applied, failed, total_count):
+        """
+        用一行汇总日志输出参数调整结果
+        Returns:
+            bool: 是否至少有一个参数设置成功
+        """
+        summary = "✅ 已应用 %d/%d: %s" % (len(applied), total_count, ", ".join(applied) or "无")
+        if failed:
+            summary += "（失败: %s）" % ", ".join(failed)
         
-        unreal.log(f"📊 参数调整结果: {success_count}/{total_count} 成功")
-        return success_count > 0
+        if applied:
+            unreal.log(summary)
+        else:
+            unreal.log_warning(summary)
+        return len(applied) > 0
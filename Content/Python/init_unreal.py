@@ -21,6 +21,14 @@ def startup():
 
 def shutdown():
     """插件关闭时调用"""
+    # 关闭后台线程池和共享的 OpenAI HTTP 连接池
+    try:
+        from ai.openai_client import close_http_client, shutdown_executor
+        shutdown_executor()
+        close_http_client()
+    except Exception as e:
+        unreal.log_warning(f"⚠️ 关闭 AI 客户端资源失败: {e}")
+    
     unreal.log(f"👋 {PLUGIN_NAME} 已卸载")
 
 
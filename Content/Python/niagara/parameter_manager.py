@@ -4,12 +4,46 @@ Niagara 参数管理器
 """
 
 import unreal
-from utils.config import Config
+import time
+from utils.config import Config, get_settings
+
+
+def _to_color(value):
+    return unreal.LinearColor(value["r"], value["g"], value["b"], value.get("a", 1.0))
+
+
+def _to_vector(value):
+    return unreal.Vector(value["x"], value["y"], value["z"])
+
+
+# 参数值分派表：标量按 type(value) 查找，结构体按键集合 frozenset(value) 查找
+# 值为 (目标类型, 转换函数)
+_SCALAR_DISPATCH = {
+    float: ("float", float),
+    int: ("float", float),
+    bool: ("bool", bool),
+}
+_STRUCT_DISPATCH = {
+    frozenset(("r", "g", "b", "a")): ("color", _to_color),
+    frozenset(("r", "g", "b")): ("color", _to_color),
+    frozenset(("x", "y", "z")): ("vector", _to_vector),
+}
 
 
 class ParameterManager:
     """Niagara 参数管理器（调用 C++ API）"""
     
+    # 参数名称 / 类型缓存有效期（秒）
+    PARAMETER_NAMES_TTL = 5.0
+    
+    # C++ 类型名 -> (get_all_parameters 输出的类型, 日志中的类型名, C++ 读取函数名, 读取失败时的默认值)
+    _TYPE_READERS = {
+        "float": ("float", "Float", "get_niagara_variable_float", lambda: 0.0),
+        "vec3": ("vector", "Vector", "get_niagara_variable_vec3", lambda: unreal.Vector(0, 0, 0)),
+        "color": ("color", "Color", "get_niagara_variable_color", lambda: unreal.LinearColor(1, 1, 1, 1)),
+        "bool": ("bool", "Bool", "get_niagara_variable_bool", lambda: False),
+    }
+    
     def __init__(self, namespace=None):
         """
         初始化参数管理器
@@ -17,6 +51,11 @@ class ParameterManager:
             namespace: 默认命名空间（User/Engine/System/Emitter）
         """
         self.namespace = namespace or Config.get_default_namespace()
+        self.verbose = get_settings().verbose
+        # 参数名称缓存: {组件路径: (时间戳, Niagara 资源, 参数名称列表)}
+        self._names_cache = {}
+        # 参数类型缓存: {组件路径: (时间戳, Niagara 资源, {参数名: 类型名})}
+        self._types_cache = {}
     
     # ==================== 场景组件管理 ====================
     
@@ -35,69 +74,148 @@ class ParameterManager:
             unreal.log_error(f"❌ 获取 Niagara 组件失败: {e}")
             return []
     
-    @staticmethod
-    def get_parameter_names(component):
+    def get_parameter_names(self, component):
         """
-        获取组件的所有参数名称
+        获取组件的所有参数名称（按组件缓存，避免每次都遍历 C++ 反射数据）
         Args:
             component: UNiagaraComponent
         Returns:
             list[str]: 参数名称列表
         """
         try:
-            names = unreal.ExposeNiagaraVariablesEditorBPLibrary.get_niagara_variable_names(component)
-            return names
+            key = component.get_path_name()
+            asset = component.get_asset()
+            
+            cached = self._names_cache.get(key)
+            if cached is not None:
+                ts, cached_asset, names = cached
+                if cached_asset == asset and time.monotonic() - ts < self.PARAMETER_NAMES_TTL:
+                    return list(names)
+            
+            names = list(unreal.ExposeNiagaraVariablesEditorBPLibrary.get_niagara_variable_names(component))
         except Exception as e:
             unreal.log_error(f"❌ 获取参数名称失败: {e}")
             return []
+        
+        self._names_cache[key] = (time.monotonic(), asset, names)
+        return list(names)
+    
+    def get_parameter_types(self, component):
+        """
+        获取组件所有参数的类型（单次 C++ 调用，按组件缓存）
+        Args:
+            component: UNiagaraComponent
+        Returns:
+            dict[str, str]: {参数名: 类型名}，类型名如 "float" / "vec3" / "color" / "bool"
+        """
+        return dict(self._get_type_map(component))
+    
+    def _get_type_map(self, component):
+        """获取缓存的参数类型表（内部查询使用，直接返回缓存对象，调用方不得修改）"""
+        try:
+            key = component.get_path_name()
+            asset = component.get_asset()
+            
+            cached = self._types_cache.get(key)
+            if cached is not None:
+                ts, cached_asset, types = cached
+                if cached_asset == asset and time.monotonic() - ts < self.PARAMETER_NAMES_TTL:
+                    return types
+            
+            type_map = unreal.ExposeNiagaraVariablesEditorBPLibrary.get_niagara_variable_types(component)
+            types = {str(name): str(type_name) for name, type_name in type_map.items()}
+        except Exception as e:
+            unreal.log_error(f"❌ 获取参数类型失败: {e}")
+            return {}
+        
+        self._types_cache[key] = (time.monotonic(), asset, types)
+        return types
+    
+    def invalidate_parameter_names(self, component=None):
+        """
+        清除参数名称和类型缓存
+        Args:
+            component: 指定组件；为 None 时清除全部缓存
+        """
+        if component is None:
+            self._names_cache.clear()
+            self._types_cache.clear()
+        else:
+            key = component.get_path_name()
+            self._names_cache.pop(key, None)
+            self._types_cache.pop(key, None)
     
     # ==================== 参数读取（调用 C++ Get 函数）====================
+    # 读取前先通过类型表确认参数存在且类型匹配，不依赖异常做类型探测
+    
+    def has_parameter(self, component, param_name, type_str=None):
+        """
+        检查组件是否有指定参数（基于缓存的类型表，不触发 C++ 读取）
+        Args:
+            component: UNiagaraComponent
+            param_name: 参数名称（可带或不带命名空间前缀）
+            type_str: 期望的类型名（如 "float" / "vec3" / "color" / "bool"），None 表示不检查类型
+        Returns:
+            bool: 参数是否存在（且类型匹配）
+        """
+        types = self._get_type_map(component)
+        type_name = types.get(param_name)
+        if type_name is None:
+            type_name = types.get(f"{self.namespace}.{param_name}")
+        if type_name is None:
+            return False
+        return type_str is None or type_name == type_str
     
     def get_float(self, component, param_name):
         """读取 Float 参数"""
-        try:
-            value = unreal.NiagaraVariableHelpers.get_niagara_variable_float(
-                component, param_name, self.namespace
-            )
-            return value
-        except Exception as e:
-            unreal.log_warning(f"⚠️ 读取 Float 参数 {param_name} 失败: {e}")
-            return 0.0
+        return self._get_checked(component, param_name, "float")
     
     def get_color(self, component, param_name):
         """读取 Color 参数"""
-        try:
-            color = unreal.NiagaraVariableHelpers.get_niagara_variable_color(
-                component, param_name, self.namespace
-            )
-            return color
-        except Exception as e:
-            unreal.log_warning(f"⚠️ 读取 Color 参数 {param_name} 失败: {e}")
-            return unreal.LinearColor(1, 1, 1, 1)
+        return self._get_checked(component, param_name, "color")
     
     def get_vector(self, component, param_name):
         """读取 Vector 参数"""
-        try:
-            vec = unreal.NiagaraVariableHelpers.get_niagara_variable_vec3(
-                component, param_name, self.namespace
-            )
-            return vec
-        except Exception as e:
-            unreal.log_warning(f"⚠️ 读取 Vector 参数 {param_name} 失败: {e}")
-            return unreal.Vector(0, 0, 0)
+        return self._get_checked(component, param_name, "vec3")
     
     def get_bool(self, component, param_name):
         """读取 Bool 参数"""
+        return self._get_checked(component, param_name, "bool")
+    
+    def _get_checked(self, component, param_name, type_str):
+        """确认参数存在且类型匹配后再读取，否则返回该类型的默认值"""
+        _, label, _, default = self._TYPE_READERS[type_str]
+        if not self.has_parameter(component, param_name, type_str):
+            unreal.log_warning(f"⚠️ 未找到 {label} 参数: {param_name}")
+            return default()
+        return self._read_variable(component, param_name, type_str)
+    
+    def _read_variable(self, component, param_name, type_str):
+        """
+        调用 C++ 读取参数值（不再检查参数是否存在）
+        Args:
+            component: UNiagaraComponent
+            param_name: 参数名称（可带或不带命名空间前缀）
+            type_str: 类型名（"float" / "vec3" / "color" / "bool"）
+        Returns:
+            读取到的值，读取失败时返回该类型的默认值
+        """
+        _, label, reader, default = self._TYPE_READERS[type_str]
+        prefix = f"{self.namespace}."
+        if param_name.startswith(prefix):
+            param_name = param_name[len(prefix):]
+        
         try:
-            value = unreal.NiagaraVariableHelpers.get_niagara_variable_bool(
-                component, param_name, self.namespace
+            found, value = getattr(unreal.ExposeNiagaraVariablesBPLibrary, reader)(
+                component, self._get_namespace_enum(), param_name
             )
-            return value
         except Exception as e:
-            unreal.log_warning(f"⚠️ 读取 Bool 参数 {param_name} 失败: {e}")
-            return False
+            unreal.log_warning(f"⚠️ 读取 {label} 参数 {param_name} 失败: {e}")
+            return default()
+        return value if found else default()
     
     # ==================== 参数写入（调用 C++ Set 函数）====================
+    # 单个参数写入同样走 set_batch 的 C++ 批量接口；成功日志仅在 verbose 模式下逐条输出
     
     def set_float(self, component, param_name, value):
         """
@@ -106,16 +224,10 @@ class ParameterManager:
             component: UNiagaraComponent
             param_name: 参数名称（如 "SpawnRate"）
             value: float 值
+        Returns:
+            bool: 是否设置成功
         """
-        try:
-            unreal.NiagaraVariableHelpers.set_niagara_variable_float(
-                component, param_name, float(value), self.namespace
-            )
-            unreal.log(f"✅ 设置 {param_name} = {value}")
-            return True
-        except Exception as e:
-            unreal.log_error(f"❌ 设置 Float 参数 {param_name} 失败: {e}")
-            return False
+        return self._set_single(component, param_name, value, f"{value}", "Float", float)
     
     def set_color(self, component, param_name, r, g, b, a=1.0):
         """
@@ -124,17 +236,11 @@ class ParameterManager:
             component: UNiagaraComponent
             param_name: 参数名称
             r, g, b, a: 颜色分量（0-1）
+        Returns:
+            bool: 是否设置成功
         """
-        try:
-            color = unreal.LinearColor(r, g, b, a)
-            unreal.NiagaraVariableHelpers.set_niagara_variable_color(
-                component, param_name, color, self.namespace
-            )
-            unreal.log(f"✅ 设置 {param_name} = RGBA({r}, {g}, {b}, {a})")
-            return True
-        except Exception as e:
-            unreal.log_error(f"❌ 设置 Color 参数 {param_name} 失败: {e}")
-            return False
+        value = {"r": r, "g": g, "b": b, "a": a}
+        return self._set_single(component, param_name, value, f"RGBA({r}, {g}, {b}, {a})", "Color")
     
     def set_vector(self, component, param_name, x, y, z):
         """
@@ -143,58 +249,113 @@ class ParameterManager:
             component: UNiagaraComponent
             param_name: 参数名称
             x, y, z: 向量分量
+        Returns:
+            bool: 是否设置成功
+        """
+        value = {"x": x, "y": y, "z": z}
+        return self._set_single(component, param_name, value, f"({x}, {y}, {z})", "Vector")
+    
+    def set_bool(self, component, param_name, value):
+        """
+        设置 Bool 参数
+        Returns:
+            bool: 是否设置成功
         """
+        return self._set_single(component, param_name, value, f"{value}", "Bool", bool)
+    
+    def _set_single(self, component, param_name, value, display, label, convert=None):
+        """写入单个参数：失败总是输出错误日志，成功只在 verbose 模式下输出"""
         try:
-            vec = unreal.Vector(x, y, z)
-            unreal.NiagaraVariableHelpers.set_niagara_variable_vec3(
-                component, param_name, vec, self.namespace
-            )
-            unreal.log(f"✅ 设置 {param_name} = ({x}, {y}, {z})")
-            return True
-        except Exception as e:
-            unreal.log_error(f"❌ 设置 Vector 参数 {param_name} 失败: {e}")
+            if convert is not None:
+                value = convert(value)
+        except (TypeError, ValueError) as e:
+            unreal.log_error(f"❌ 设置 {label} 参数 {param_name} 失败: {e}")
             return False
+        
+        applied, _ = self.set_batch(component, {param_name: value})
+        if not applied:
+            unreal.log_error(f"❌ 设置 {label} 参数 {param_name} 失败")
+            return False
+        if self.verbose:
+            unreal.log(f"✅ 设置 {param_name} = {display}")
+        return True
     
-    def set_bool(self, component, param_name, value):
-        """设置 Bool 参数"""
+    # ==================== 批量操作 ====================
+    
+    def set_batch(self, component, adjustments):
+        """
+        一次性设置多个参数（单次 C++ 调用，避免逐个参数往返）
+        Args:
+            component: UNiagaraComponent
+            adjustments: {参数名: 值}，值可以是 float / int / bool /
+                         {"r", "g", "b"[, "a"]} / {"x", "y", "z"}（键必须完全一致）
+        Returns:
+            tuple[list[str], list[str]]: (设置成功的参数名, 设置失败的参数名)
+        """
+        buckets = {"float": {}, "color": {}, "vector": {}, "bool": {}}
+        requested = []
+        failed = []
+        
+        for param_name, value in adjustments.items():
+            handler = _SCALAR_DISPATCH.get(type(value))
+            if handler is None and type(value) is dict:
+                handler = _STRUCT_DISPATCH.get(frozenset(value))
+            if handler is None:
+                if self.verbose:
+                    unreal.log_warning(f"⚠️ 未知参数类型: {param_name} = {value}")
+                failed.append(param_name)
+                continue
+            
+            kind, convert = handler
+            try:
+                buckets[kind][param_name] = convert(value)
+            except (TypeError, ValueError) as e:
+                # 单个参数的值无效（如颜色分量为 null）只让该参数失败，其余参数照常写入
+                unreal.log_warning(f"⚠️ 参数值无效: {param_name} = {value} ({e})")
+                failed.append(param_name)
+                continue
+            requested.append(param_name)
+        
+        if not requested:
+            return [], failed
+        
         try:
-            unreal.NiagaraVariableHelpers.set_niagara_variable_bool(
-                component, param_name, bool(value), self.namespace
+            _, failed_names = unreal.ExposeNiagaraVariablesBPLibrary.set_niagara_variables_batch(
+                component, self._get_namespace_enum(),
+                buckets["float"], buckets["color"], buckets["vector"], buckets["bool"]
             )
-            unreal.log(f"✅ 设置 {param_name} = {value}")
-            return True
         except Exception as e:
-            unreal.log_error(f"❌ 设置 Bool 参数 {param_name} 失败: {e}")
-            return False
+            unreal.log_error(f"❌ 批量设置参数失败: {e}")
+            return [], failed + requested
+        
+        failed_set = {str(name) for name in failed_names}
+        if failed_set:
+            # 参数表可能已变化（新增/删除参数），下次重新读取
+            self.invalidate_parameter_names(component)
+        applied = [name for name in requested if name not in failed_set]
+        failed.extend(name for name in requested if name in failed_set)
+        return applied, failed
     
-    # ==================== 批量操作 ====================
+    def _get_namespace_enum(self):
+        """将命名空间字符串转换为 C++ 的 ENiagaraNamespace 枚举"""
+        return getattr(unreal.NiagaraNamespace, self.namespace.upper(), unreal.NiagaraNamespace.USER)
     
     def get_all_parameters(self, component):
         """
         获取组件的所有参数及其值
+        先一次性查询参数类型表，再直接调用对应类型的读取方法
         Returns:
-            dict: {参数名: 参数值}
+            dict: {参数名: {"type": 类型, "value": 值}}
         """
-        param_names = self.get_parameter_names(component)
         params = {}
         
-        for name in param_names:
-            # 尝试不同类型读取（简化版，实际应根据类型判断）
-            try:
-                # 先尝试 Float（最常用）
-                value = self.get_float(component, name)
-                params[name] = {"type": "float", "value": value}
-            except:
-                try:
-                    # 尝试 Vector
-                    value = self.get_vector(component, name)
-                    params[name] = {"type": "vector", "value": value}
-                except:
-                    # 尝试 Color
-                    try:
-                        value = self.get_color(component, name)
-                        params[name] = {"type": "color", "value": value}
-                    except:
-                        params[name] = {"type": "unknown", "value": None}
+        # 类型表中已包含类型信息，直接读取，不再逐个检查参数是否存在
+        for name, type_name in self._get_type_map(component).items():
+            reader = self._TYPE_READERS.get(type_name)
+            if reader is None:
+                params[name] = {"type": type_name, "value": None}
+                continue
+            
+            params[name] = {"type": reader[0], "value": self._read_variable(component, name, type_name)}
         
         return params
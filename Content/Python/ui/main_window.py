@@ -4,6 +4,7 @@ AI Niagara FX Tool - 主窗口
 """
 
 import unreal
+import asyncio
 import sys
 import os
 
@@ -13,24 +14,103 @@ if plugin_python_path not in sys.path:
     sys.path.insert(0, plugin_python_path)
 
 from niagara.parameter_manager import ParameterManager
-from ai.openai_client import NiagaraAIAssistant
+from ai.openai_client import NiagaraAIAssistant, _get_event_loop
 
 
 class AINiagaraToolWindow:
     """AI Niagara 工具窗口（简化版，使用对话框）"""
     
+    # 关卡中的 Actor 发生变化时触发的编辑器事件（各 UE 版本可用的事件不同，不存在的会被跳过）
+    LEVEL_CHANGE_DELEGATES = (
+        ("EditorActorSubsystem", ("on_new_actors_dropped", "on_delete_actors_end",
+                                  "on_duplicate_actors_end", "on_edit_paste_actors_end")),
+        ("LevelEditorSubsystem", ("on_map_opened", "on_map_changed")),
+    )
+    
     def __init__(self):
         self.param_manager = ParameterManager()
         self.ai_assistant = NiagaraAIAssistant(self.param_manager)
         self.selected_component = None
         self.components = []
+        self._components_by_path = {}
+        self._dirty = True
+        self._level_callbacks = []
+        self._register_level_callbacks()
+    
+    def _register_level_callbacks(self):
+        """注册关卡变化回调：场景中的 Actor 增删或切换关卡时标记组件缓存失效"""
+        def _mark_dirty(*args):
+            self._dirty = True
+        
+        for subsystem_name, delegate_names in self.LEVEL_CHANGE_DELEGATES:
+            try:
+                subsystem = unreal.get_editor_subsystem(getattr(unreal, subsystem_name))
+            except Exception:
+                continue
+            for delegate_name in delegate_names:
+                delegate = getattr(subsystem, delegate_name, None)
+                if delegate is None:
+                    continue
+                try:
+                    delegate.add_callable(_mark_dirty)
+                    self._level_callbacks.append((delegate, _mark_dirty))
+                except Exception as e:
+                    unreal.log_warning(f"⚠️ 注册关卡变化回调 {delegate_name} 失败: {e}")
+    
+    def dispose(self):
+        """注销关卡变化回调（窗口被替换时调用）"""
+        for delegate, callback in self._level_callbacks:
+            try:
+                delegate.remove_callable(callback)
+            except Exception:
+                pass
+        self._level_callbacks = []
+    
+    def get_components(self, force_refresh=False):
+        """
+        获取场景中的 Niagara 组件（缓存结果，只在关卡变化后重新遍历场景）
+        Args:
+            force_refresh: 是否忽略缓存强制重新遍历
+        Returns:
+            list[UNiagaraComponent]: Niagara 组件列表
+        """
+        if self._dirty or force_refresh:
+            self.components = list(self.param_manager.get_all_niagara_components())
+            self._components_by_path = {comp.get_path_name(): comp for comp in self.components}
+            self._dirty = False
+        return self.components
+    
+    def _resolve_component(self, component_id):
+        """
+        根据组件索引或组件路径查找组件
+        Args:
+            component_id: int 组件索引，或 str 组件路径（get_path_name()）
+        Returns:
+            UNiagaraComponent | None: 找不到时返回 None
+        """
+        components = self.get_components()
+        
+        if isinstance(component_id, str):
+            component = self._components_by_path.get(component_id)
+            if component is None:
+                # 缓存可能错过了某些场景变化，重新遍历一次再查找
+                self.get_components(force_refresh=True)
+                component = self._components_by_path.get(component_id)
+            if component is None:
+                unreal.log_error(f"❌ 未找到组件: {component_id}")
+            return component
+        
+        if component_id < 0 or component_id >= len(components):
+            unreal.log_error(f"❌ 无效的组件索引: {component_id}")
+            return None
+        return components[component_id]
     
     def show(self):
         """显示工具窗口"""
         unreal.log("🪟 打开 AI Niagara FX 工具")
         
         # 获取场景中的 Niagara 组件
-        self.components = self.param_manager.get_all_niagara_components()
+        self.get_components()
         
         if not self.components:
             self._show_message("未找到 Niagara 组件", 
@@ -48,7 +128,7 @@ class AINiagaraToolWindow:
             actor_name = actor.get_name() if actor else "Unknown"
             asset = comp.get_asset()
             asset_name = asset.get_name() if asset else "No Asset"
-            component_names.append(f"{i}. {actor_name} - {asset_name}")
+            component_names.append(f"{i}. {actor_name} - {asset_name} ({comp.get_path_name()})")
         
         message = "选择要调整的 Niagara 组件:\n\n" + "\n".join(component_names)
         message += "\n\n请在输出日志中输入组件编号（0-{})".format(len(self.components) - 1)
@@ -62,7 +142,7 @@ class AINiagaraToolWindow:
         unreal.log("💡 使用方法:")
         unreal.log("  1. 在 Python 控制台中运行:")
         unreal.log("     import ui.main_window")
-        unreal.log("     ui.main_window.select_component_and_adjust(组件编号, '调整需求')")
+        unreal.log("     ui.main_window.select_component_and_adjust(组件编号或组件路径, '调整需求')")
         unreal.log("  2. 示例:")
         unreal.log("     ui.main_window.select_component_and_adjust(0, '让火焰更大更红')")
         unreal.log("=" * 60)
@@ -76,18 +156,21 @@ class AINiagaraToolWindow:
             unreal.AppMsgType.OK
         )
     
-    def adjust_component(self, component_index, user_input):
+    def adjust_component(self, component_id, user_input, use_cache=True):
         """
-        调整指定组件
+        调整指定组件（异步执行，完成后弹出结果对话框）
         Args:
-            component_index: 组件索引
+            component_id: 组件索引（int）或组件路径（str）
             user_input: 用户输入的调整需求
+            use_cache: 是否使用缓存的回答；False 时强制重新请求 AI
+        Returns:
+            bool: 是否成功发起调整
         """
-        if component_index < 0 or component_index >= len(self.components):
-            unreal.log_error(f"❌ 无效的组件索引: {component_index}")
+        component = self._resolve_component(component_id)
+        if component is None:
             return False
         
-        self.selected_component = self.components[component_index]
+        self.selected_component = component
         actor = self.selected_component.get_owner()
         actor_name = actor.get_name() if actor else "Unknown"
         
@@ -103,18 +186,57 @@ class AINiagaraToolWindow:
                              "2. 重启 UE 编辑器")
             return False
         
-        # 调用 AI 调整参数
-        success = self.ai_assistant.adjust_parameters(
-            self.selected_component, 
-            user_input
+        def _on_complete(success):
+            if success:
+                self._show_message("调整成功", f"AI 已完成参数调整!\n\n输入: {user_input}")
+            else:
+                self._show_message("调整失败", "AI 调整失败，请查看输出日志获取详细信息。")
+        
+        # 在后台请求 AI，等待期间编辑器保持响应；完成后在游戏线程写入参数并提示结果
+        return self.ai_assistant.adjust_parameters_in_background(
+            self.selected_component,
+            user_input,
+            on_complete=_on_complete,
+            use_cache=use_cache
         )
+    
+    def batch_adjust(self, component_ids, user_inputs, use_cache=True):
+        """
+        批量调整多个组件（并发请求 AI，总耗时约等于最慢的一次请求）
+        Args:
+            component_ids: 组件索引或组件路径列表
+            user_inputs: 与组件一一对应的调整需求列表
+            use_cache: 是否使用缓存的回答；False 时强制重新请求 AI
+        Returns:
+            list[bool]: 每个组件是否调整成功
+        """
+        if len(component_ids) != len(user_inputs):
+            unreal.log_error("❌ 组件索引数量与调整需求数量不一致")
+            return []
         
-        if success:
-            self._show_message("调整成功", f"AI 已完成参数调整!\n\n输入: {user_input}")
-        else:
-            self._show_message("调整失败", "AI 调整失败，请查看输出日志获取详细信息。")
+        if not self.ai_assistant.is_available():
+            unreal.log_error("❌ AI 服务不可用，请配置 OpenAI API Key 后重试")
+            return [False] * len(component_ids)
+        
+        pairs = []
+        for component_id, user_input in zip(component_ids, user_inputs):
+            component = self._resolve_component(component_id)
+            if component is None:
+                return []
+            pairs.append((component, user_input))
+        
+        unreal.log(f"🚀 并发调整 {len(pairs)} 个组件")
+        
+        async def _gather():
+            return await asyncio.gather(*[
+                self.ai_assistant.adjust_parameters_async(component, user_input, use_cache)
+                for component, user_input in pairs
+            ])
+        
+        results = _get_event_loop().run_until_complete(_gather())
         
-        return success
+        unreal.log(f"📊 批量调整结果: {sum(results)}/{len(results)} 成功")
+        return list(results)
 
 
 # ==================== 全局辅助函数 ====================
@@ -124,31 +246,55 @@ _tool_window = None
 def open_tool_window():
     """打开工具窗口（从菜单调用）"""
     global _tool_window
+    if _tool_window is not None:
+        _tool_window.dispose()
     _tool_window = AINiagaraToolWindow()
     _tool_window.show()
 
 
-def select_component_and_adjust(component_index, user_input):
+def select_component_and_adjust(component_id, user_input, use_cache=True):
     """
     选择组件并调整（简化版 API）
     
     使用示例:
         import ui.main_window
         ui.main_window.select_component_and_adjust(0, "让火焰更大更红")
+        ui.main_window.select_component_and_adjust("/Game/Maps/Main.Main:PersistentLevel.Fire.NiagaraComponent0", "让火焰更大更红")
     
     Args:
-        component_index: 组件索引（从 0 开始）
+        component_id: 组件索引（从 0 开始）或组件路径（get_path_name()）
         user_input: 自然语言描述的调整需求
+        use_cache: 是否使用缓存的回答；对缓存的结果不满意时传 False 强制重新请求 AI
     """
     global _tool_window
     
-    # 如果窗口未创建，先创建
+    # 如果窗口未创建，先创建（组件列表在首次查找时获取并缓存）
     if _tool_window is None:
         _tool_window = AINiagaraToolWindow()
-        _tool_window.components = _tool_window.param_manager.get_all_niagara_components()
     
     # 执行调整
-    _tool_window.adjust_component(component_index, user_input)
+    _tool_window.adjust_component(component_id, user_input, use_cache)
+
+
+def batch_adjust(component_ids, user_inputs, use_cache=True):
+    """
+    批量选择组件并调整（并发请求 AI）
+    
+    使用示例:
+        import ui.main_window
+        ui.main_window.batch_adjust([0, 1], ["让火焰更大更红", "减慢粒子速度"])
+    
+    Args:
+        component_ids: 组件索引（从 0 开始）或组件路径列表
+        user_inputs: 与组件一一对应的自然语言调整需求
+        use_cache: 是否使用缓存的回答
+    """
+    global _tool_window
+    
+    if _tool_window is None:
+        _tool_window = AINiagaraToolWindow()
+    
+    return _tool_window.batch_adjust(component_ids, user_inputs, use_cache)
 
 
 def quick_test():
@@ -4,7 +4,10 @@
 """
 
 import unreal
+import functools
 import os
+from dataclasses import dataclass
+from typing import Optional
 
 class Config:
     """配置管理器"""
@@ -13,6 +16,15 @@ class Config:
     DEFAULT_OPENAI_MODEL = "gpt-4"
     DEFAULT_TEMPERATURE = 0.7
     DEFAULT_NAMESPACE = "User"
+    DEFAULT_CACHE_MAX_ENTRIES = 1000
+    DEFAULT_CACHE_TTL = 7 * 24 * 3600
+    DEFAULT_CACHE_DYNAMIC_TTL = 3600
+    DEFAULT_SEMANTIC_CACHE_THRESHOLD = 0.92
+    # 提示词以中文为主，必须使用多语言句向量模型（纯英文模型对只差一个字的中文短句给出几乎相同的向量）
+    DEFAULT_SEMANTIC_CACHE_MODEL = "paraphrase-multilingual-MiniLM-L12-v2"
+    DEFAULT_SEMANTIC_CACHE_ENABLED = True
+    DEFAULT_STREAM_ENABLED = True
+    DEFAULT_VERBOSE = False
     
     @staticmethod
     def get_api_key():
@@ -46,10 +58,122 @@ class Config:
         temp = os.getenv("OPENAI_TEMPERATURE", str(Config.DEFAULT_TEMPERATURE))
         return float(temp)
     
+    @staticmethod
+    def get_stream_enabled():
+        """是否使用流式响应（边生成边应用参数）"""
+        stream = os.getenv("OPENAI_STREAM")
+        if stream is None:
+            return Config.DEFAULT_STREAM_ENABLED
+        return stream.strip().lower() not in ("0", "false", "no", "off")
+    
+    @staticmethod
+    def get_verbose():
+        """是否输出逐个参数的详细日志（默认只输出汇总）"""
+        verbose = os.getenv("AINIAGARA_VERBOSE")
+        if verbose is None:
+            return Config.DEFAULT_VERBOSE
+        return verbose.strip().lower() in ("1", "true", "yes", "on")
+    
     @staticmethod
     def get_default_namespace():
         """获取默认的 Niagara 参数命名空间"""
         return Config.DEFAULT_NAMESPACE
+    
+    @staticmethod
+    def get_cache_path():
+        """
+        获取 LLM 响应缓存文件路径
+        优先级：环境变量 > 项目 Saved 目录
+        """
+        cache_path = os.getenv("AINIAGARA_CACHE_PATH")
+        if cache_path:
+            return cache_path
+        saved_dir = unreal.Paths.project_saved_dir()
+        return os.path.join(saved_dir, "AINiagaraFXPlugin", "llm_cache.sqlite")
+    
+    @staticmethod
+    def get_cache_max_entries():
+        """获取 LLM 响应缓存的最大条目数"""
+        max_entries = os.getenv("AINIAGARA_CACHE_MAX_ENTRIES", str(Config.DEFAULT_CACHE_MAX_ENTRIES))
+        return int(max_entries)
+    
+    @staticmethod
+    def get_cache_ttl():
+        """获取 LLM 响应缓存的默认有效期（秒）"""
+        ttl = os.getenv("AINIAGARA_CACHE_TTL", str(Config.DEFAULT_CACHE_TTL))
+        return float(ttl)
+    
+    @staticmethod
+    def get_cache_dynamic_ttl():
+        """获取包含时效性词语（如 "当前"、"现在"）的提示词的缓存有效期（秒）"""
+        ttl = os.getenv("AINIAGARA_CACHE_DYNAMIC_TTL", str(Config.DEFAULT_CACHE_DYNAMIC_TTL))
+        return float(ttl)
+    
+    @staticmethod
+    def get_semantic_cache_threshold():
+        """获取语义缓存的余弦相似度阈值（越高越严格）"""
+        threshold = os.getenv("AINIAGARA_SEMANTIC_THRESHOLD", str(Config.DEFAULT_SEMANTIC_CACHE_THRESHOLD))
+        return float(threshold)
+    
+    @staticmethod
+    def get_semantic_cache_model():
+        """获取语义缓存使用的 sentence-transformers 模型名称"""
+        return os.getenv("AINIAGARA_SEMANTIC_MODEL", Config.DEFAULT_SEMANTIC_CACHE_MODEL)
+    
+    @staticmethod
+    def get_semantic_cache_enabled():
+        """是否启用语义缓存（精确缓存不受影响）"""
+        enabled = os.getenv("AINIAGARA_SEMANTIC_CACHE")
+        if enabled is None:
+            return Config.DEFAULT_SEMANTIC_CACHE_ENABLED
+        return enabled.strip().lower() not in ("0", "false", "no", "off")
+
+
+@dataclass(frozen=True)
+class Settings:
+    """只读的配置快照（进程内只读取一次环境变量）"""
+    api_key: Optional[str]
+    model: str
+    temperature: float
+    stream: bool
+    verbose: bool
+    cache_path: str
+    cache_max_entries: int
+    cache_ttl: float
+    cache_dynamic_ttl: float
+    semantic_cache_threshold: float
+    semantic_cache_model: str
+    semantic_cache_enabled: bool
+
+
+@functools.lru_cache(maxsize=1)
+def get_settings():
+    """
+    获取缓存的配置快照
+    多次打开工具窗口时不再重复读取环境变量和输出日志；修改配置后调用 reload_settings()
+    Returns:
+        Settings: 配置快照
+    """
+    return Settings(
+        api_key=Config.get_api_key(),
+        model=Config.get_model_name(),
+        temperature=Config.get_temperature(),
+        stream=Config.get_stream_enabled(),
+        verbose=Config.get_verbose(),
+        cache_path=Config.get_cache_path(),
+        cache_max_entries=Config.get_cache_max_entries(),
+        cache_ttl=Config.get_cache_ttl(),
+        cache_dynamic_ttl=Config.get_cache_dynamic_ttl(),
+        semantic_cache_threshold=Config.get_semantic_cache_threshold(),
+        semantic_cache_model=Config.get_semantic_cache_model(),
+        semantic_cache_enabled=Config.get_semantic_cache_enabled()
+    )
+
+
+def reload_settings():
+    """丢弃缓存的配置快照并重新读取"""
+    get_settings.cache_clear()
+    return get_settings()
 
 
 def validate_config():
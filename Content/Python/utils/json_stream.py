@@ -0,0 +1,95 @@
+"""
+流式 JSON 解析
+从逐块到达的 AI 响应中增量提取 "parameters" 对象里已经完整的参数条目
+"""
+
+# 优先使用 orjson（C 实现），未安装时回退到标准库
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
+
+
+class ParametersStreamParser:
+    """
+    基于括号计数的轻量状态机
+    只关心顶层 "parameters" 对象：每当其中一个条目闭合（遇到逗号或右括号），
+    就把该条目解析为 (参数名, 值) 返回，其余内容原样累积
+    """
+
+    PARAMETERS_KEY = "parameters"
+
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_key = None       # 顶层最近一个字符串（用于识别 "parameters" 键）
+        self._in_parameters = False
+        self._parameters_done = False
+        self._entry_start = 0
+
+    def feed(self, text):
+        """
+        输入新到达的文本片段
+        Args:
+            text: 响应片段
+        Returns:
+            list[tuple[str, object]]: 本次新完成的参数条目
+        """
+        self._text += text
+        buffer = self._text
+
+        entries = []
+        for i in range(self._pos, len(buffer)):
+            c = buffer[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_key = buffer[self._string_start + 1:i]
+                continue
+
+            if c == '"':
+                self._in_string = True
+                self._string_start = i
+            elif c in "{[":
+                self._depth += 1
+                if (c == "{" and self._depth == 2 and not self._parameters_done
+                        and self._last_key == self.PARAMETERS_KEY):
+                    self._in_parameters = True
+                    self._entry_start = i + 1
+            elif c in "}]":
+                if self._in_parameters and self._depth == 2:
+                    entries.extend(self._parse_entry(buffer[self._entry_start:i]))
+                    self._in_parameters = False
+                    self._parameters_done = True
+                self._depth -= 1
+            elif c == "," and self._in_parameters and self._depth == 2:
+                entries.extend(self._parse_entry(buffer[self._entry_start:i]))
+                self._entry_start = i + 1
+
+        self._pos = len(buffer)
+        return entries
+
+    def get_text(self):
+        """获取目前累积的完整文本"""
+        return self._text
+
+    @staticmethod
+    def _parse_entry(segment):
+        """将 `"名称": 值` 片段解析为 [(名称, 值)]，不完整或无效时返回空列表"""
+        segment = segment.strip()
+        if not segment:
+            return []
+        try:
+            return list(_json.loads("{" + segment + "}").items())
+        except ValueError:
+            return []
@@ -0,0 +1,212 @@
+"""
+LLM 响应缓存
+基于 SQLite 的精确匹配 LRU 缓存，避免相同提示词重复调用 OpenAI API
+每个条目带有效期（TTL），缓存 Key 中带有系统提示词和参数结构的版本戳
+"""
+
+import unreal
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+# 优先使用 orjson 序列化（C 实现），未安装时回退到标准库
+try:
+    import orjson
+except ImportError:
+    import json
+    orjson = None
+
+
+def _canonical_json(payload):
+    """
+    生成规范化 JSON 字节串（键排序、紧凑分隔符、非 ASCII 字符原样保留）
+    标准库回退的输出与 orjson 完全一致，保证两种环境下生成的缓存 Key 相同
+    """
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(
+        payload, sort_keys=True, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+# 表示提示词依赖"当下状态"的词语，命中时使用较短的缓存有效期
+_DYNAMIC_TOKEN_PATTERN = re.compile(r"\b(current|currently|now)\b|当前|现在|此刻|目前", re.IGNORECASE)
+
+
+def _stable_hash(text):
+    """跨进程稳定的短哈希（内置 hash() 对字符串每次启动都会随机化，不能用于持久化缓存）"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def schema_hash(param_names):
+    """
+    计算组件参数结构的版本戳（与参数顺序无关）
+    Args:
+        param_names: 组件的全部参数名称
+    Returns:
+        str: 16 位十六进制哈希
+    """
+    return _stable_hash("\n".join(sorted(param_names)))
+
+
+def make_cache_key(model, temperature, system_prompt, user_prompt, param_names=()):
+    """
+    生成确定性的缓存 Key
+    只包含影响输出的字段（stream / user / api_key 等不参与计算），
+    并附带 (系统提示词哈希, 参数结构哈希) 版本戳：提示词或组件参数变化后旧条目自动失效
+    Args:
+        model: 模型名称
+        temperature: 温度参数
+        system_prompt: 系统提示词
+        user_prompt: 用户提示词
+        param_names: 组件的全部参数名称
+    Returns:
+        str: SHA-256 十六进制字符串
+    """
+    system_prompt = unicodedata.normalize("NFC", system_prompt)
+    payload = {
+        "m": model,
+        "t": temperature,
+        "sys": system_prompt,
+        "u": unicodedata.normalize("NFC", user_prompt),
+        "v": [_stable_hash(system_prompt), schema_hash(param_names)],
+    }
+    return hashlib.sha256(_canonical_json(payload)).hexdigest()
+
+
+def choose_ttl(user_input, static_ttl, dynamic_ttl):
+    """
+    根据用户输入选择缓存有效期
+    Args:
+        user_input: 用户输入的自然语言
+        static_ttl: 普通提示词的有效期（秒）
+        dynamic_ttl: 包含时效性词语（"当前"、"现在"、"now" 等）时的有效期（秒）
+    Returns:
+        float: 有效期（秒）
+    """
+    if _DYNAMIC_TOKEN_PATTERN.search(user_input or ""):
+        return dynamic_ttl
+    return static_ttl
+
+
+class CacheStore:
+    """SQLite LRU 缓存（WAL 模式，按 last_used_ts 淘汰，读取时清除过期条目）"""
+
+    DEFAULT_TTL = 7 * 24 * 3600
+
+    def __init__(self, sqlite_path, max_entries=1000, default_ttl=DEFAULT_TTL):
+        """
+        打开（必要时创建）缓存数据库
+        Args:
+            sqlite_path: SQLite 文件路径
+            max_entries: 最大缓存条目数，超出后淘汰最久未使用的条目
+            default_ttl: 未指定有效期时使用的默认有效期（秒）
+        """
+        self.sqlite_path = sqlite_path
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+
+        cache_dir = os.path.dirname(sqlite_path)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+        self._conn = sqlite3.connect(sqlite_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                tokens_in INTEGER DEFAULT 0,
+                tokens_out INTEGER DEFAULT 0,
+                created_ts REAL NOT NULL,
+                last_used_ts REAL NOT NULL,
+                ttl REAL
+            )"""
+        )
+        # 兼容旧版本创建的缓存库（没有 ttl 列的条目按默认有效期处理）
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(llm_cache)")]
+        if "ttl" not in columns:
+            self._conn.execute("ALTER TABLE llm_cache ADD COLUMN ttl REAL")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache (last_used_ts)"
+        )
+        self._conn.commit()
+
+    def get(self, key):
+        """
+        读取缓存
+        Args:
+            key: 缓存 Key
+        Returns:
+            str | None: 缓存的响应内容，未命中或已过期返回 None
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_ts, ttl FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            value, created_ts, ttl = row
+            if ttl is None:
+                ttl = self.default_ttl
+            if now - created_ts > ttl:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+
+            self._conn.execute(
+                "UPDATE llm_cache SET last_used_ts = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            return value
+
+    def put(self, key, value, tokens_in=0, tokens_out=0, ttl=None):
+        """
+        写入缓存，超出容量时淘汰最久未使用的条目
+        Args:
+            key: 缓存 Key
+            value: 响应内容
+            tokens_in: 提示词 token 数
+            tokens_out: 生成 token 数
+            ttl: 有效期（秒），None 表示使用默认有效期
+        """
+        now = time.time()
+        if ttl is None:
+            ttl = self.default_ttl
+        with self._lock:
+            self._conn.execute(
+                """INSERT OR REPLACE INTO llm_cache
+                   (key, value, tokens_in, tokens_out, created_ts, last_used_ts, ttl)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                (key, value, tokens_in, tokens_out, now, now, ttl)
+            )
+
+            count = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    """DELETE FROM llm_cache WHERE key IN (
+                           SELECT key FROM llm_cache ORDER BY last_used_ts LIMIT ?
+                       )""",
+                    (overflow,)
+                )
+            self._conn.commit()
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+        unreal.log("🧹 LLM 缓存已清空")
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,161 @@
+"""
+LLM 语义缓存
+基于句向量相似度匹配语义相近的提示词，复用精确缓存中已有的响应
+"""
+
+import unreal
+import importlib.util
+import threading
+from utils.llm_cache import schema_hash
+
+# 只检查依赖是否存在；sentence-transformers（及 torch）体积很大，在后台线程首次加载模型时才真正导入
+SEMANTIC_CACHE_AVAILABLE = (
+    importlib.util.find_spec("numpy") is not None
+    and importlib.util.find_spec("sentence_transformers") is not None
+)
+if not SEMANTIC_CACHE_AVAILABLE:
+    unreal.log_warning("⚠️ 未安装 sentence-transformers 库，语义缓存已禁用（pip install sentence-transformers）")
+
+np = None  # 模型加载完成后才导入 numpy
+
+
+class SemanticCache:
+    """
+    语义缓存索引
+    只保存 (向量, 参数结构哈希, 精确缓存 Key)，响应内容本身仍存放在 CacheStore 中
+    向量只对用户输入本身计算；只在参数结构哈希完全一致的条目之间比较相似度
+    句向量模型在后台线程加载（首次使用可能需要下载），加载完成前查询直接视为未命中
+    """
+
+    # 多语言模型：all-MiniLM-L6-v2 等纯英文模型无法区分 "更大" / "更小" 这类中文短句
+    DEFAULT_MODEL_NAME = "paraphrase-multilingual-MiniLM-L12-v2"
+
+    def __init__(self, threshold=0.92, max_entries=1000, model_name=None):
+        """
+        初始化语义缓存
+        Args:
+            threshold: 余弦相似度阈值，达到该值才视为命中
+            max_entries: 最大条目数，超出后淘汰最早加入的条目
+            model_name: sentence-transformers 模型名称
+        """
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.model_name = model_name or self.DEFAULT_MODEL_NAME
+        self._model = None
+        self._loader = None
+        self._lock = threading.Lock()
+        self._embeddings = None  # shape: (n, dim)，行向量已归一化
+        self._schemas = []
+        self._keys = []
+
+    @staticmethod
+    def is_available():
+        """检查语义缓存依赖是否可用"""
+        return SEMANTIC_CACHE_AVAILABLE
+
+    def _get_model(self):
+        """
+        获取句向量模型，尚未加载时在后台线程开始加载（不阻塞游戏线程）
+        Returns:
+            SentenceTransformer | None: 模型尚未就绪时返回 None
+        """
+        if self._model is not None:
+            return self._model
+        
+        with self._lock:
+            if self._loader is None:
+                self._loader = threading.Thread(
+                    target=self._load_model, name="AINiagaraFXSemanticCache", daemon=True
+                )
+                self._loader.start()
+        return None
+    
+    def _load_model(self):
+        """在后台线程中导入依赖并加载模型"""
+        global np
+        try:
+            import numpy
+            from sentence_transformers import SentenceTransformer
+            np = numpy
+            self._model = SentenceTransformer(self.model_name)
+            unreal.log(f"📦 语义缓存模型已加载: {self.model_name}")
+        except Exception as e:
+            unreal.log_warning(f"⚠️ 加载语义缓存模型失败，语义缓存已禁用: {e}")
+
+    def _embed(self, user_input):
+        """
+        计算用户输入的归一化句向量，模型尚未就绪时返回 None
+        不拼接参数列表：同一组件的提示词会共享很长的相同后缀，"更大" 和 "更小" 的向量会被拉得过近
+        """
+        model = self._get_model()
+        if model is None:
+            return None
+        vector = model.encode(user_input, normalize_embeddings=True)
+        return np.asarray(vector, dtype=np.float32)
+
+    def lookup(self, user_input, param_names):
+        """
+        查找语义最相近的缓存条目
+        Args:
+            user_input: 用户输入的自然语言
+            param_names: 当前组件的参数名称列表
+        Returns:
+            str | None: 命中时返回精确缓存 Key，否则返回 None
+        """
+        # 先触发模型的后台加载，保证后续 add() 能尽早写入索引
+        if self._get_model() is None:
+            return None
+
+        schema = schema_hash(param_names)
+        candidates = [i for i, entry_schema in enumerate(self._schemas) if entry_schema == schema]
+        if not candidates:
+            return None
+
+        query = self._embed(user_input)
+        if query is None:
+            return None
+
+        embeddings = self._embeddings[candidates]
+        norms = np.linalg.norm(embeddings, axis=1)
+        similarities = embeddings @ query / (norms * np.linalg.norm(query))
+
+        best = int(np.argmax(similarities))
+        best_index = candidates[best]
+        best_score = float(similarities[best])
+        if best_score < self.threshold:
+            return None
+
+        unreal.log(f"🧠 语义缓存命中（相似度 {best_score:.3f}）")
+        return self._keys[best_index]
+
+    def add(self, user_input, param_names, cache_key):
+        """
+        添加语义缓存条目
+        Args:
+            user_input: 用户输入的自然语言
+            param_names: 当前组件的参数名称列表
+            cache_key: 对应的精确缓存 Key
+        """
+        vector = self._embed(user_input)
+        if vector is None:
+            return
+        vector = vector[np.newaxis, :]
+
+        if self._embeddings is None:
+            self._embeddings = vector
+        else:
+            self._embeddings = np.vstack([self._embeddings, vector])
+        self._schemas.append(schema_hash(param_names))
+        self._keys.append(cache_key)
+
+        overflow = len(self._keys) - self.max_entries
+        if overflow > 0:
+            self._embeddings = self._embeddings[overflow:]
+            self._schemas = self._schemas[overflow:]
+            self._keys = self._keys[overflow:]
+
+    def clear(self):
+        """清空语义缓存"""
+        self._embeddings = None
+        self._schemas = []
+        self._keys = []
@@ -231,4 +231,11 @@ bool UExposeNiagaraVariablesBPLibrary::SetNiagaraVariableMatrix4(UNiagaraCompone
 bool UExposeNiagaraVariablesBPLibrary::SetNiagaraVariableUTexture(UNiagaraComponent* NiagaraComponent, ENiagaraNamespace Namespace, FName VariableName, UTexture* Value)
 {
     return UNiagaraVariableHelpers::SetNiagaraVariableUTexture(NiagaraComponent, Namespace, VariableName, Value);
-}
\ No newline at end of file
+}
+
+int32 UExposeNiagaraVariablesBPLibrary::SetNiagaraVariablesBatch(UNiagaraComponent* NiagaraComponent, ENiagaraNamespace Namespace,
+    const TMap<FName, float>& FloatValues, const TMap<FName, FLinearColor>& ColorValues,
+    const TMap<FName, FVector>& VectorValues, const TMap<FName, bool>& BoolValues, TArray<FName>& OutFailedNames)
+{
+    return UNiagaraVariableHelpers::SetNiagaraVariablesBatch(NiagaraComponent, Namespace, FloatValues, ColorValues, VectorValues, BoolValues, OutFailedNames);
+}
@@ -26,6 +26,21 @@ FName UNiagaraVariableHelpers::AppendNamespaceToVariableName(ENiagaraNamespace N
     return FName(*NamespacePrefix + VariableName.ToString());
 }
 
+FName UNiagaraVariableHelpers::GetNiagaraTypeShortName(const FNiagaraTypeDefinition& TypeDef)
+{
+    if (TypeDef == FNiagaraTypeDefinition::GetFloatDef())       return FName(TEXT("float"));
+    if (TypeDef == FNiagaraTypeDefinition::GetIntDef())         return FName(TEXT("int"));
+    if (TypeDef == FNiagaraTypeDefinition::GetBoolDef())        return FName(TEXT("bool"));
+    if (TypeDef == FNiagaraTypeDefinition::GetVec2Def())        return FName(TEXT("vec2"));
+    if (TypeDef == FNiagaraTypeDefinition::GetVec3Def())        return FName(TEXT("vec3"));
+    if (TypeDef == FNiagaraTypeDefinition::GetVec4Def())        return FName(TEXT("vec4"));
+    if (TypeDef == FNiagaraTypeDefinition::GetColorDef())       return FName(TEXT("color"));
+    if (TypeDef == FNiagaraTypeDefinition::GetQuatDef())        return FName(TEXT("quat"));
+    if (TypeDef == FNiagaraTypeDefinition::GetMatrix4Def())     return FName(TEXT("matrix4"));
+    if (TypeDef == FNiagaraTypeDefinition::GetPositionDef())    return FName(TEXT("position"));
+    return TypeDef.GetFName();
+}
+
 // Helper function to retrieve a Niagara variable
 template<typename T> 
 bool GetNiagaraVariable(UNiagaraComponent* NiagaraComponent, ENiagaraNamespace Namespace, FName VariableName, T& OutValue, const FNiagaraTypeDefinition& TypeDef)
@@ -372,4 +387,71 @@ bool UNiagaraVariableHelpers::SetNiagaraVariableUTexture(UNiagaraComponent* Niag
     ParameterStore.SetParameterValue(Value, Variable);
 
     return true;
-}
\ No newline at end of file
+}
+
+// Helper function to write a map of same-typed values into a Niagara parameter store
+template<typename TValue, typename TStored>
+static int32 SetNiagaraVariablesOfType(FNiagaraParameterStore& ParameterStore, ENiagaraNamespace Namespace, const TMap<FName, TValue>& Values, const FNiagaraTypeDefinition& TypeDef, TArray<FName>& OutFailedNames)
+{
+    int32 SetCount = 0;
+    for (const TPair<FName, TValue>& Pair : Values)
+    {
+        FNiagaraVariable Variable(TypeDef, UNiagaraVariableHelpers::AppendNamespaceToVariableName(Namespace, Pair.Key));
+        if (ParameterStore.IndexOf(Variable) == INDEX_NONE)
+        {
+            // Failures are returned to the caller, which logs one summary line for the whole batch
+            UE_LOG(LogTemp, Verbose, TEXT("Parameter not found: %s"), *Variable.GetName().ToString());
+            OutFailedNames.Add(Pair.Key);
+            continue;
+        }
+
+        ParameterStore.SetParameterValue(TStored(Pair.Value), Variable);
+        ++SetCount;
+    }
+    return SetCount;
+}
+
+int32 UNiagaraVariableHelpers::SetNiagaraVariablesBatch(UNiagaraComponent* NiagaraComponent, ENiagaraNamespace Namespace,
+    const TMap<FName, float>& FloatValues, const TMap<FName, FLinearColor>& ColorValues,
+    const TMap<FName, FVector>& VectorValues, const TMap<FName, bool>& BoolValues, TArray<FName>& OutFailedNames)
+{
+    auto FailAll = [&]()
+    {
+        for (const TPair<FName, float>& Pair : FloatValues) { OutFailedNames.Add(Pair.Key); }
+        for (const TPair<FName, FLinearColor>& Pair : ColorValues) { OutFailedNames.Add(Pair.Key); }
+        for (const TPair<FName, FVector>& Pair : VectorValues) { OutFailedNames.Add(Pair.Key); }
+        for (const TPair<FName, bool>& Pair : BoolValues) { OutFailedNames.Add(Pair.Key); }
+        return 0;
+    };
+
+    if (!IsValid(NiagaraComponent) || !NiagaraComponent->GetAsset())
+    {
+        UE_LOG(LogTemp, Warning, TEXT("NiagaraComponent or Asset is null."));
+        return FailAll();
+    }
+
+    // Resolve the system instance once for the whole batch
+    FNiagaraSystemInstanceControllerPtr SystemInstanceController = NiagaraComponent->GetSystemInstanceController();
+    if (!SystemInstanceController.IsValid())
+    {
+        UE_LOG(LogTemp, Warning, TEXT("SystemInstanceController is not valid."));
+        return FailAll();
+    }
+
+    FNiagaraSystemInstance* SystemInstance = SystemInstanceController->GetSystemInstance_Unsafe();
+    if (!SystemInstance)
+    {
+        UE_LOG(LogTemp, Warning, TEXT("SystemInstance is null."));
+        return FailAll();
+    }
+
+    FNiagaraParameterStore& ParameterStore = SystemInstance->GetInstanceParameters();
+
+    int32 SetCount = 0;
+    SetCount += SetNiagaraVariablesOfType<float, float>(ParameterStore, Namespace, FloatValues, FNiagaraTypeDefinition::GetFloatDef(), OutFailedNames);
+    SetCount += SetNiagaraVariablesOfType<FLinearColor, FLinearColor>(ParameterStore, Namespace, ColorValues, FNiagaraTypeDefinition::GetColorDef(), OutFailedNames);
+    SetCount += SetNiagaraVariablesOfType<FVector, FVector3f>(ParameterStore, Namespace, VectorValues, FNiagaraTypeDefinition::GetVec3Def(), OutFailedNames);
+    SetCount += SetNiagaraVariablesOfType<bool, FNiagaraBool>(ParameterStore, Namespace, BoolValues, FNiagaraTypeDefinition::GetBoolDef(), OutFailedNames);
+
+    return SetCount;
+}
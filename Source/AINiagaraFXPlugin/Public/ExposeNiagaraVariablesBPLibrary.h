@@ -118,4 +118,10 @@ public:
 
      UFUNCTION(BlueprintCallable, Category = "Niagara|Variables")
         static bool SetNiagaraVariableUTexture(class UNiagaraComponent* NiagaraComponent, ENiagaraNamespace Namespace, FName VariableName, UTexture* Value);
+
+    /** Set several Float / Color / Vec3 / Bool variables in one call. Returns the number of variables written. */
+    UFUNCTION(BlueprintCallable, Category = "Niagara|Variables")
+        static int32 SetNiagaraVariablesBatch(class UNiagaraComponent* NiagaraComponent, ENiagaraNamespace Namespace,
+            const TMap<FName, float>& FloatValues, const TMap<FName, FLinearColor>& ColorValues,
+            const TMap<FName, FVector>& VectorValues, const TMap<FName, bool>& BoolValues, TArray<FName>& OutFailedNames);
 };
\ No newline at end of file
@@ -32,6 +32,9 @@ public:
 
     static FName AppendNamespaceToVariableName(ENiagaraNamespace Namespace, FName VariableName);
 
+    // Short type name used by the Python layer ("float", "vec3", "color", ...); falls back to the Niagara type name
+    static FName GetNiagaraTypeShortName(const FNiagaraTypeDefinition& TypeDef);
+
     // Functions for retrieving Niagara variables
     static bool GetNiagaraVariableActor(class UNiagaraComponent* NiagaraComponent, ENiagaraNamespace Namespace, FName VariableName, class AActor* &OutValue);
     static bool GetNiagaraVariableBool(class UNiagaraComponent* NiagaraComponent, ENiagaraNamespace Namespace, FName VariableName, bool& OutValue);
@@ -60,4 +63,10 @@ public:
     static bool SetNiagaraVariableID(class UNiagaraComponent* NiagaraComponent, ENiagaraNamespace Namespace, FName VariableName, const FNiagaraID& Value);
     static bool SetNiagaraVariableMatrix4(class UNiagaraComponent* NiagaraComponent, ENiagaraNamespace Namespace, FName VariableName, const FMatrix& Value);
     static bool SetNiagaraVariableUTexture(class UNiagaraComponent* NiagaraComponent, ENiagaraNamespace Namespace, FName VariableName, UTexture* Value);
+
+    // Batch setter: resolves the system instance once and writes every entry into its parameter store.
+    // Returns the number of variables written; names that were not found are appended to OutFailedNames.
+    static int32 SetNiagaraVariablesBatch(class UNiagaraComponent* NiagaraComponent, ENiagaraNamespace Namespace,
+        const TMap<FName, float>& FloatValues, const TMap<FName, FLinearColor>& ColorValues,
+        const TMap<FName, FVector>& VectorValues, const TMap<FName, bool>& BoolValues, TArray<FName>& OutFailedNames);
    };
\ No newline at end of file
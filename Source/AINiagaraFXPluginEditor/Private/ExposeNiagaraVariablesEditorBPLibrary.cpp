@@ -57,4 +57,58 @@ TArray<UNiagaraComponent*> UExposeNiagaraVariablesEditorBPLibrary::GetAllNiagara
 
     UE_LOG(LogTemp, Log, TEXT("From AI Niagara FX Plugin: Found %d Niagara Components in Scene"), NiagaraComponents.Num());
     return NiagaraComponents;
-}
\ No newline at end of file
+}
+
+TMap<FName, FName> UExposeNiagaraVariablesEditorBPLibrary::GetNiagaraVariableTypes(UNiagaraComponent* NiagaraComponent)
+{
+    TMap<FName, FName> VariableTypes;
+
+    if (!NiagaraComponent)
+    {
+        UE_LOG(LogTemp, Warning, TEXT("GetNiagaraVariableTypes: Invalid Niagara Component!"));
+        return VariableTypes;
+    }
+
+    UNiagaraSystem* NiagaraSystem = NiagaraComponent->GetAsset();
+    if (!NiagaraSystem)
+    {
+        UE_LOG(LogTemp, Warning, TEXT("GetNiagaraVariableTypes: No valid Niagara System!"));
+        return VariableTypes;
+    }
+
+    // **Editor Mode**: Use the exposed user parameters when the component is not running
+    if (!NiagaraComponent->IsActive())
+    {
+        TArray<FNiagaraVariable> UserParams;
+        NiagaraSystem->GetExposedParameters().GetUserParameters(UserParams);
+
+        for (const FNiagaraVariable& UserParam : UserParams)
+        {
+            VariableTypes.Add(UserParam.GetName(), UNiagaraVariableHelpers::GetNiagaraTypeShortName(UserParam.GetType()));
+        }
+        return VariableTypes;
+    }
+
+    // **Runtime Mode**: Read the parameters from the system instance
+    FNiagaraSystemInstanceControllerPtr SystemInstanceController = NiagaraComponent->GetSystemInstanceController();
+    if (!SystemInstanceController.IsValid())
+    {
+        UE_LOG(LogTemp, Warning, TEXT("GetNiagaraVariableTypes: No valid System Instance Controller!"));
+        return VariableTypes;
+    }
+
+    FNiagaraSystemInstance* SystemInstance = SystemInstanceController->GetSystemInstance_Unsafe();
+    if (!SystemInstance)
+    {
+        UE_LOG(LogTemp, Warning, TEXT("GetNiagaraVariableTypes: No valid System Instance!"));
+        return VariableTypes;
+    }
+
+    const FNiagaraParameterStore& ParameterStore = SystemInstance->GetInstanceParameters();
+    for (const FNiagaraVariableBase& Parameter : ParameterStore.ReadParameterVariables())
+    {
+        VariableTypes.Add(Parameter.GetName(), UNiagaraVariableHelpers::GetNiagaraTypeShortName(Parameter.GetType()));
+    }
+
+    return VariableTypes;
+}
@@ -28,4 +28,8 @@ public:
     UFUNCTION(BlueprintCallable, Category = "Niagara|Editor", meta = (CallInEditor = "true"))
     static TArray<UNiagaraComponent*> GetAllNiagaraComponentsInScene();
 
+    /** Get every parameter of a Niagara component mapped to its short type name ("float", "vec3", "color", ...) */
+    UFUNCTION(BlueprintCallable, Category = "Niagara|Editor", meta = (CallInEditor = "true"))
+    static TMap<FName, FName> GetNiagaraVariableTypes(UNiagaraComponent* NiagaraComponent);
+
 };
\ No newline at end of file